@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the S1 Display render and transmit hot paths
+Runs without the panel, sending packets to a null or emulated transport
+
+Usage:
+    python3 benchmarks/run_benchmarks.py                      # table on stdout
+    python3 benchmarks/run_benchmarks.py -o results.json      # also save JSON
+    python3 benchmarks/run_benchmarks.py --compare base.json  # show change vs a saved run
+    python3 benchmarks/run_benchmarks.py -k text              # only names containing 'text'
+    python3 benchmarks/run_benchmarks.py -t hidraw            # real write syscalls (to /dev/null)
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from core import s1_display
+from core.s1_display import S1Display
+from core.fonts import FontRenderer
+from core.transports import create_transport
+from dashboard import Dashboard
+
+CONFIG_PATH = os.path.join(ROOT, 'config.yaml')
+
+# Timed batches per benchmark; the median batch is reported
+BATCHES = 5
+
+# Extra options per transport name, set from the command line
+transport_options = {}
+
+
+def make_display(transport, **options):
+    """A connected display on a non-hardware transport, sending without pacing"""
+    display = S1Display(pacing=S1Display.PACING_NONE,
+                        transport=create_transport(transport, **transport_options.get(transport, {})),
+                        **options)
+    display.connect()
+    return display
+
+
+def make_dashboard(transport):
+    """The shipped config.yaml rendered by a Dashboard with fixed widget values"""
+    dashboard = Dashboard(CONFIG_PATH)
+    dashboard.display = make_display(transport)
+    dashboard.font = FontRenderer(dashboard.display)
+    dashboard.create_widgets()
+    dashboard.compute_layout()
+    # Sample every widget once so rendering never waits on psutil or the network
+    for _, widget in dashboard.widgets:
+        if not widget.sample_inline:
+            widget.cached_value = widget.get_value()
+            widget.sampled = True
+    return dashboard
+
+
+# Each benchmark takes the transport name and returns a callable that draws
+# (and/or sends) one frame per call, given the iteration number
+
+def bench_clear(transport):
+    display = make_display(transport)
+    return lambda i: display.clear(i & 0xFF, 0, 0)
+
+
+def bench_fill_rect(transport):
+    display = make_display(transport)
+    return lambda i: display.fill_rect(20, 20, 200, 100, 0, i & 0xFF, 0)
+
+
+def bench_set_pixel(transport):
+    display = make_display(transport)
+
+    def frame(i):
+        for x in range(0, 320, 4):
+            display.set_pixel(x, i % 170, 255, 255, 255)
+    return frame
+
+
+def _text_bench(method, transport, centered=False):
+    display = make_display(transport)
+    font = FontRenderer(display)
+    draw = getattr(font, method)
+    # Changing digits exercise the glyph cache and the text run cache
+    if centered:
+        return lambda i: draw(40, f"{i % 24:02d}:{i % 60:02d}", 255, 255, 255, scale=4)
+    return lambda i: draw(5, 60, f"CPU: {i % 100}% MEM: {i % 64}%", 255, 255, 0, scale=2)
+
+
+def bench_draw_text_3x5(transport):
+    return _text_bench('draw_text_3x5', transport)
+
+
+def bench_draw_text_5x7(transport):
+    return _text_bench('draw_text_5x7', transport)
+
+
+def bench_draw_text_centered_3x5(transport):
+    return _text_bench('draw_text_centered_3x5', transport, centered=True)
+
+
+def bench_draw_text_centered_5x7(transport):
+    return _text_bench('draw_text_centered_5x7', transport, centered=True)
+
+
+def bench_draw_progress_bar(transport):
+    display = make_display(transport)
+    font = FontRenderer(display)
+    return lambda i: font.draw_progress_bar(90, 80, 60, 8, i % 101, (100, 255, 255))
+
+
+def bench_dashboard_render_full(transport):
+    dashboard = make_dashboard(transport)
+    return lambda i: dashboard.render(force=True)
+
+
+def bench_dashboard_render_changed(transport):
+    """Incremental render with one widget changing every frame"""
+    dashboard = make_dashboard(transport)
+    dashboard.render()
+    widgets = dict(dashboard.widgets)
+    widget = widgets.get('hostname') or next(iter(widgets.values()))
+
+    def frame(i):
+        widget.cached_value = f"host-{i % 1000}"
+        dashboard.render()
+    return frame
+
+
+def bench_dashboard_render_idle(transport):
+    """Render call when nothing changed (should skip the frame)"""
+    dashboard = make_dashboard(transport)
+    dashboard.render()
+    return lambda i: dashboard.render()
+
+
+def bench_update_display_full(transport):
+    display = make_display(transport)
+    return lambda i: display.update_display()
+
+
+def bench_update_display_partial(transport):
+    display = make_display(transport, partial_updates=True)
+    display.update_display()
+
+    def frame(i):
+        display.fill_rect(100, 40, 60, 20, i & 0xFF, 0, 0)
+        display.update_display()
+    return frame
+
+
+def bench_update_display_shadow(transport):
+    """Shadow frame mode with one small change per frame"""
+    display = make_display(transport, shadow_frame=True)
+    display.update_display()
+
+    def frame(i):
+        display.fill_rect(100, 40, 60, 20, i & 0xFF, 0, 0)
+        display.update_display()
+    return frame
+
+
+BENCHMARKS = [
+    ('clear', bench_clear),
+    ('fill_rect', bench_fill_rect),
+    ('set_pixel', bench_set_pixel),
+    ('draw_text_3x5', bench_draw_text_3x5),
+    ('draw_text_5x7', bench_draw_text_5x7),
+    ('draw_text_centered_3x5', bench_draw_text_centered_3x5),
+    ('draw_text_centered_5x7', bench_draw_text_centered_5x7),
+    ('draw_progress_bar', bench_draw_progress_bar),
+    ('dashboard_render_full', bench_dashboard_render_full),
+    ('dashboard_render_changed', bench_dashboard_render_changed),
+    ('dashboard_render_idle', bench_dashboard_render_idle),
+    ('update_display_full', bench_update_display_full),
+    ('update_display_partial', bench_update_display_partial),
+    ('update_display_shadow', bench_update_display_shadow),
+]
+
+
+def calibrate(frame, min_time):
+    """Iterations per batch so that one batch takes about min_time seconds"""
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for i in range(iterations):
+            frame(i)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 4 or iterations >= 1 << 20:
+            return max(1, int(iterations * min_time / max(elapsed, 1e-9)))
+        iterations *= 4
+
+
+def measure_allocations(frame, iterations):
+    """Per-frame allocation peak and retained bytes, measured with tracemalloc
+
+    Runs separately from the timed batches because tracing slows allocation.
+    """
+    tracemalloc.start()
+    try:
+        frame(0)  # Populate caches outside the measurement
+        baseline, _ = tracemalloc.get_traced_memory()
+        peak = 0
+        for i in range(iterations):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            frame(i)
+            _, frame_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame_peak - before)
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, (current - baseline) / iterations
+
+
+def run_benchmark(name, factory, transport, min_time):
+    """Time one benchmark and return its result record"""
+    frame = factory(transport)
+    frame(0)  # Warm up caches
+    iterations = calibrate(frame, min_time)
+
+    batch_times = []
+    for _ in range(BATCHES):
+        start = time.perf_counter()
+        for i in range(iterations):
+            frame(i)
+        batch_times.append((time.perf_counter() - start) / iterations)
+    per_frame = statistics.median(batch_times)
+
+    alloc_peak, alloc_net = measure_allocations(frame, min(iterations, 200))
+    return {
+        'name': name,
+        'iterations': iterations * BATCHES,
+        'us_per_frame': round(per_frame * 1e6, 3),
+        'us_per_frame_min': round(min(batch_times) * 1e6, 3),
+        'fps': round(1.0 / per_frame, 1) if per_frame else None,
+        'alloc_peak_bytes': alloc_peak,
+        'alloc_net_bytes': round(alloc_net, 1),
+    }
+
+
+def print_table(results, baseline=None):
+    """Human-readable summary, with the change against a baseline run if given"""
+    previous = {r['name']: r for r in baseline['results']} if baseline else {}
+    header = f"{'benchmark':<28}{'us/frame':>12}{'fps':>12}{'alloc peak':>12}{'alloc net':>11}"
+    if previous:
+        header += f"{'vs base':>10}"
+    print(header)
+    for r in results:
+        line = (f"{r['name']:<28}{r['us_per_frame']:>12.1f}{r['fps'] or 0:>12.1f}"
+                f"{r['alloc_peak_bytes']:>12}{r['alloc_net_bytes']:>11.1f}")
+        old = previous.get(r['name'])
+        if old and old['us_per_frame']:
+            change = (r['us_per_frame'] - old['us_per_frame']) / old['us_per_frame'] * 100
+            line += f"{change:>+9.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark S1 Display render and transmit paths")
+    parser.add_argument('-o', '--output', help="write results as JSON to this file")
+    parser.add_argument('--json', action='store_true', help="print JSON instead of a table")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    parser.add_argument('-k', '--filter', default='', help="only run benchmarks whose name contains this")
+    parser.add_argument('-t', '--transport', default='null', choices=['null', 'loopback', 'hidraw'],
+                        help="transport receiving the packets (default: null)")
+    parser.add_argument('--device', default='/dev/null',
+                        help="file the hidraw transport writes to (default: /dev/null; "
+                             "a /dev/hidrawN node measures the panel itself)")
+    parser.add_argument('--no-batch', action='store_true',
+                        help="hidraw: one write() per packet instead of one writev() per frame")
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="approximate seconds per timed batch (default: 0.2)")
+    args = parser.parse_args()
+    transport_options['hidraw'] = {'path': args.device, 'batch': not args.no_batch}
+
+    results = []
+    for name, factory in BENCHMARKS:
+        if args.filter in name:
+            results.append(run_benchmark(name, factory, args.transport, args.min_time))
+            if not args.json:
+                print(f"  {name} done", file=sys.stderr)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': s1_display.numpy is not None,
+        'transport': args.transport,
+        'transport_options': transport_options.get(args.transport, {}),
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        baseline = None
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+        print_table(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
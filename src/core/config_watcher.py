@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Config file change detection for S1 Display
+Uses inotify on Linux, falling back to polling the modification time
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import time
+
+
+class ConfigWatcher:
+    """Detects changes to a config file
+
+    The containing directory is watched rather than the file itself, so
+    editors that save by renaming a temporary file are picked up too.
+    """
+
+    # inotify event masks (from <sys/inotify.h>)
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+
+    # struct inotify_event header: wd, mask, cookie, len
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, path: str, poll_interval: float = 1.0):
+        self.path = os.path.abspath(path)
+        self.poll_interval = poll_interval
+        self._fd = None
+        self._mtime = self._get_mtime()
+        self._last_poll = time.monotonic()
+        self._start_inotify()
+
+    def _start_inotify(self):
+        """Set up a non-blocking inotify watch, leaving _fd as None if unavailable"""
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return
+            mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+            directory = os.path.dirname(self.path).encode()
+            if libc.inotify_add_watch(fd, directory, mask) < 0:
+                os.close(fd)
+                return
+            self._fd = fd
+        except (OSError, AttributeError):
+            # No libc inotify (non-Linux); fall back to polling
+            self._fd = None
+
+    def _get_mtime(self):
+        """Modification time of the config file, or None if it is missing"""
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def changed(self) -> bool:
+        """Check (without blocking) whether the file changed since the last call"""
+        if self._fd is not None:
+            return self._read_events()
+
+        now = time.monotonic()
+        if now - self._last_poll < self.poll_interval:
+            return False
+        self._last_poll = now
+
+        mtime = self._get_mtime()
+        if mtime != self._mtime:
+            self._mtime = mtime
+            return True
+        return False
+
+    def _read_events(self) -> bool:
+        """Drain pending inotify events, reporting whether any concern the config file"""
+        name = os.path.basename(self.path)
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return changed
+
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                event_name = data[offset:offset + length].rstrip(b'\0').decode(errors='replace')
+                offset += length
+                if event_name == name:
+                    changed = True
+
+    def close(self):
+        """Release the inotify descriptor"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
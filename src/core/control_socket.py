@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Local control socket for the S1 Display dashboard
+Lets other processes (such as the web GUI) talk to the running dashboard
+
+Protocol: one request per connection. The client sends a JSON object on a
+single line, optionally followed by a binary payload of exactly 'size'
+bytes. The server answers with one JSON line, likewise followed by a
+payload when the reply carries 'size'.
+
+Operations:
+    apply_config   {"config": {...}}                 -> {"ok", "applied"}
+    values         {}                                -> {"ok", "widgets": [...]}
+    framebuffer    {}                                -> {"ok", "width", "height", "size"} + pixels
+    wait_frame     {"since", "timeout"}              -> {"ok", "seq", "width", "height"[, "size"]}
+                                                        + pixels of the next frame sent, if any
+    overlay        {"x", "y", "width", "height", "duration", "size"} + pixels -> {"ok"}
+    clear_overlay  {}                                -> {"ok"}
+    metrics        {}                                -> {"ok", "text"} (Prometheus text format)
+
+Pixel payloads use the framebuffer format (see S1Display.blit). An overlay
+covering the whole screen replaces the dashboard output; duration 0 keeps
+it until cleared.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+
+DEFAULT_SOCKET_PATH = '/run/s1-display.sock'
+
+# Upper bound for a request line (a full config is a few KB)
+MAX_LINE = 1024 * 1024
+
+
+class ControlError(Exception):
+    """Raised by ControlClient when the dashboard rejects or cannot serve a request"""
+
+
+def read_message(stream):
+    """Read one JSON line and its payload (if any) from a socket file"""
+    line = stream.readline(MAX_LINE)
+    if not line:
+        return None, b''
+    message = json.loads(line)
+    size = message.get('size', 0)
+    payload = stream.read(size) if size else b''
+    if len(payload) != size:
+        raise ValueError(f"Expected {size} payload bytes, got {len(payload)}")
+    return message, payload
+
+
+def write_message(stream, message, payload=b''):
+    """Write one JSON line followed by an optional payload"""
+    if payload:
+        message = dict(message, size=len(payload))
+    stream.write(json.dumps(message).encode() + b'\n')
+    if payload:
+        stream.write(payload)
+    stream.flush()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Handles one request on the control socket"""
+
+    def handle(self):
+        try:
+            message, payload = read_message(self.rfile)
+            if message is None:
+                return
+            reply, data = self.server.control.dispatch(message, payload)
+        except Exception as e:
+            reply, data = {'ok': False, 'error': str(e)}, b''
+        try:
+            write_message(self.wfile, reply, data)
+        except OSError:
+            pass
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ControlServer:
+    """Serves the control socket for a Dashboard
+
+    Requests are answered on the socket's own threads, but operations that
+    touch the display or widgets run on the dashboard's render loop (via
+    Dashboard.call_in_loop), so they never race with render().
+    """
+
+    # How long a request may wait for the render loop
+    CALL_TIMEOUT = 5.0
+
+    # Longest wait_frame long poll
+    MAX_WAIT = 30.0
+
+    def __init__(self, dashboard, path: str = DEFAULT_SOCKET_PATH):
+        self.dashboard = dashboard
+        self.path = path
+        self._server = None
+        self._thread = None
+
+    def start(self) -> bool:
+        """Bind the socket and start serving; returns False if it cannot be bound"""
+        try:
+            if os.path.exists(self.path):
+                # Stale socket from a previous run
+                os.unlink(self.path)
+            self._server = _Server(self.path, _Handler)
+            os.chmod(self.path, 0o660)
+        except OSError as e:
+            print(f"Control socket unavailable at {self.path}: {e}")
+            self._server = None
+            return False
+
+        self._server.control = self
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='control-socket', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Stop serving and remove the socket file"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=2)
+        self._server = None
+        self._thread = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def dispatch(self, message, payload):
+        """Serve one request; returns (reply, payload)"""
+        op = message.get('op')
+        dashboard = self.dashboard
+        call = dashboard.call_in_loop
+
+        if op == 'apply_config':
+            config = message.get('config')
+            if not isinstance(config, dict):
+                raise ValueError("apply_config needs a config object")
+            applied = call(dashboard.apply_config, config, timeout=self.CALL_TIMEOUT)
+            return {'ok': True, 'applied': applied}, b''
+
+        if op == 'values':
+            widgets = call(dashboard.widget_values, timeout=self.CALL_TIMEOUT)
+            return {'ok': True, 'widgets': widgets}, b''
+
+        if op == 'framebuffer':
+            pixels = call(lambda: bytes(dashboard.display.framebuffer), timeout=self.CALL_TIMEOUT)
+            return {'ok': True, 'width': dashboard.display.WIDTH,
+                    'height': dashboard.display.HEIGHT}, pixels
+
+        if op == 'wait_frame':
+            # Waits on the caller's thread; the render loop is never blocked
+            timeout = min(float(message.get('timeout', 5.0)), self.MAX_WAIT)
+            seq, frame = dashboard.wait_for_frame(message.get('since'), timeout)
+            return {'ok': True, 'seq': seq, 'width': dashboard.display.WIDTH,
+                    'height': dashboard.display.HEIGHT}, frame or b''
+
+        if op == 'overlay':
+            width, height = int(message['width']), int(message['height'])
+            if len(payload) != width * height * dashboard.display.BYTES_PER_PIXEL:
+                raise ValueError(f"Overlay payload does not match {width}x{height} pixels")
+            call(dashboard.set_overlay, int(message.get('x', 0)), int(message.get('y', 0)),
+                 width, height, payload, float(message.get('duration', 10.0)),
+                 timeout=self.CALL_TIMEOUT)
+            return {'ok': True}, b''
+
+        if op == 'clear_overlay':
+            call(dashboard.clear_overlay, timeout=self.CALL_TIMEOUT)
+            return {'ok': True}, b''
+
+        if op == 'metrics':
+            # The registry is thread-safe, so this does not wait for the render loop
+            return {'ok': True, 'text': dashboard.metrics.render()}, b''
+
+        raise ValueError(f"Unknown operation: {op}")
+
+
+class ControlClient:
+    """Client side of the control socket"""
+
+    def __init__(self, path: str = DEFAULT_SOCKET_PATH, timeout: float = 6.0):
+        self.path = path
+        self.timeout = timeout
+
+    def available(self) -> bool:
+        """Whether a dashboard is listening on the socket"""
+        return os.path.exists(self.path)
+
+    def request(self, op: str, payload: bytes = b'', wait: float = 0.0, **fields):
+        """Send one request; returns (reply, payload) or raises ControlError
+
+        wait extends the socket timeout for requests that block on purpose.
+        """
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout + wait)
+                sock.connect(self.path)
+                with sock.makefile('rwb') as stream:
+                    write_message(stream, dict(fields, op=op), payload)
+                    reply, data = read_message(stream)
+        except (OSError, ValueError) as e:
+            raise ControlError(f"Control socket {self.path}: {e}")
+        if reply is None:
+            raise ControlError("Dashboard closed the connection")
+        if not reply.get('ok'):
+            raise ControlError(reply.get('error', 'Request failed'))
+        return reply, data
+
+    def apply_config(self, config) -> bool:
+        """Apply a config to the running dashboard; returns True if anything changed"""
+        reply, _ = self.request('apply_config', config=config)
+        return reply['applied']
+
+    def values(self):
+        """Current output of every widget"""
+        reply, _ = self.request('values')
+        return reply['widgets']
+
+    def framebuffer(self):
+        """Current framebuffer as (width, height, pixels)"""
+        reply, data = self.request('framebuffer')
+        return reply['width'], reply['height'], data
+
+    def wait_frame(self, since=None, timeout: float = 5.0):
+        """Wait for a frame newer than sequence number since
+
+        Returns (seq, pixels), with pixels None if no new frame was sent
+        within timeout.
+        """
+        reply, data = self.request('wait_frame', since=since, timeout=timeout, wait=timeout)
+        return reply['seq'], data or None
+
+    def overlay(self, x: int, y: int, width: int, height: int, pixels: bytes,
+                duration: float = 10.0):
+        """Draw pixels over the dashboard for duration seconds (0 = until cleared)"""
+        self.request('overlay', pixels, x=x, y=y, width=width, height=height,
+                     duration=duration)
+
+    def clear_overlay(self):
+        """Remove any overlay and repaint the dashboard"""
+        self.request('clear_overlay')
+
+    def metrics(self) -> str:
+        """Frame timings and counters in the Prometheus text format"""
+        reply, _ = self.request('metrics')
+        return reply['text']
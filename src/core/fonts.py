@@ -4,6 +4,8 @@ Font rendering for S1 Display
 Includes multiple font sizes for different information density
 """
 
+from collections import OrderedDict
+
 # Small 3x5 font (compact, good for labels and info)
 FONT_3X5 = {
     'A': ["111", "101", "111", "101", "101"],
@@ -96,11 +98,95 @@ FONT_5X7 = {
 }
 
 
+# Glyph tables by name: (table, character marking a lit cell, width, height)
+FONTS = {
+    '3x5': (FONT_3X5, '1', 3, 5),
+    '5x7': (FONT_5X7, '#', 5, 7),
+}
+
+
 class FontRenderer:
     """Renders text using bitmap fonts"""
 
+    # Maximum number of rasterized glyphs kept (least recently used are evicted)
+    GLYPH_CACHE_SIZE = 512
+
+    # Maximum number of rendered text runs kept
+    TEXT_CACHE_SIZE = 128
+
     def __init__(self, display):
         self.display = display
+        self._glyph_cache = OrderedDict()
+        self._text_cache = OrderedDict()
+        self.text_cache_hits = 0
+        self.text_cache_misses = 0
+
+    def _get_glyph(self, font: str, char: str, scale: int, color: tuple) -> list:
+        """Get the pixel spans for a character, rasterizing it on first use"""
+        key = (font, char, scale, color)
+        spans = self._glyph_cache.get(key)
+        if spans is not None:
+            self._glyph_cache.move_to_end(key)
+            return spans
+
+        table, lit, _, _ = FONTS[font]
+        pixel = self.display.rgb565(*color).to_bytes(2, 'little')
+
+        # Each run of lit cells becomes one span per scaled row
+        spans = []
+        for row_idx, row in enumerate(table[char]):
+            runs = []
+            col = 0
+            while col < len(row):
+                if row[col] == lit:
+                    start = col
+                    while col < len(row) and row[col] == lit:
+                        col += 1
+                    runs.append((start * scale, pixel * ((col - start) * scale)))
+                else:
+                    col += 1
+            for dy in range(row_idx * scale, (row_idx + 1) * scale):
+                spans.extend(self.display.make_span(dx, dy, pixels) for dx, pixels in runs)
+
+        self._glyph_cache[key] = spans
+        if len(self._glyph_cache) > self.GLYPH_CACHE_SIZE:
+            self._glyph_cache.popitem(last=False)
+        return spans
+
+    def _get_text_run(self, font: str, text: str, scale: int, color: tuple) -> list:
+        """Get the pixel spans for a whole string, composing it from glyphs on first use"""
+        key = (text, font, scale, color)
+        spans = self._text_cache.get(key)
+        if spans is not None:
+            self._text_cache.move_to_end(key)
+            self.text_cache_hits += 1
+            return spans
+
+        self.text_cache_misses += 1
+        table, _, char_width, _ = FONTS[font]
+        advance = (char_width + 1) * scale
+
+        spans = []
+        for idx, char in enumerate(text):
+            char = char.upper()
+            if char not in table:
+                char = ' '
+            cx = idx * advance
+            for _, dx, dy, pixels in self._get_glyph(font, char, scale, color):
+                spans.append(self.display.make_span(cx + dx, dy, pixels))
+
+        self._text_cache[key] = spans
+        if len(self._text_cache) > self.TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        return spans
+
+    def _draw_text(self, font: str, x: int, y: int, text: str, color: tuple, scale: int) -> int:
+        """Draw a cached text run and return the x position after it"""
+        _, _, char_width, char_height = FONTS[font]
+        spans = self._get_text_run(font, text, scale, color)
+        advance = (char_width + 1) * scale
+        self.display.blit_spans(x, y, spans, len(text) * advance, char_height * scale)
+        return x + len(text) * advance
 
     def draw_char_3x5(self, x: int, y: int, char: str, r: int, g: int, b: int, scale: int = 1):
         """Draw a 3x5 character"""
@@ -108,13 +194,8 @@ class FontRenderer:
         if char not in FONT_3X5:
             char = ' '
 
-        pattern = FONT_3X5[char]
-        for row_idx, row in enumerate(pattern):
-            for col_idx, pixel in enumerate(row):
-                if pixel == '1':
-                    px = x + (col_idx * scale)
-                    py = y + (row_idx * scale)
-                    self.display.fill_rect(px, py, scale, scale, r, g, b)
+        spans = self._get_glyph('3x5', char, scale, (r, g, b))
+        self.display.blit_spans(x, y, spans, 3 * scale, 5 * scale)
 
     def draw_char_5x7(self, x: int, y: int, char: str, r: int, g: int, b: int, scale: int = 1):
         """Draw a 5x7 character"""
@@ -122,37 +203,16 @@ class FontRenderer:
         if char not in FONT_5X7:
             char = ' '
 
-        pattern = FONT_5X7[char]
-        for row_idx, row in enumerate(pattern):
-            for col_idx, pixel in enumerate(row):
-                if pixel == '#':
-                    px = x + (col_idx * scale)
-                    py = y + (row_idx * scale)
-                    self.display.fill_rect(px, py, scale, scale, r, g, b)
+        spans = self._get_glyph('5x7', char, scale, (r, g, b))
+        self.display.blit_spans(x, y, spans, 5 * scale, 7 * scale)
 
     def draw_text_3x5(self, x: int, y: int, text: str, r: int, g: int, b: int, scale: int = 1):
         """Draw text using 3x5 font"""
-        current_x = x
-        char_width = 3 * scale
-        spacing = 1 * scale
-
-        for char in text:
-            self.draw_char_3x5(current_x, y, char, r, g, b, scale)
-            current_x += char_width + spacing
-
-        return current_x
+        return self._draw_text('3x5', x, y, text, (r, g, b), scale)
 
     def draw_text_5x7(self, x: int, y: int, text: str, r: int, g: int, b: int, scale: int = 1):
         """Draw text using 5x7 font"""
-        current_x = x
-        char_width = 5 * scale
-        spacing = 1 * scale
-
-        for char in text:
-            self.draw_char_5x7(current_x, y, char, r, g, b, scale)
-            current_x += char_width + spacing
-
-        return current_x
+        return self._draw_text('5x7', x, y, text, (r, g, b), scale)
 
     def measure_text_3x5(self, text: str, scale: int = 1) -> int:
         """Get width of text in pixels"""
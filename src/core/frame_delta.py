@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Frame delta encoding for S1 Display
+Describes the change between two framebuffers as rectangles of RLE pixels
+
+Each run is 3 bytes: a count (1-255) followed by one pixel in framebuffer
+format. Runs cover a rectangle row by row and may continue across rows.
+"""
+
+from itertools import chain, groupby
+
+BYTES_PER_PIXEL = 2
+
+# Pixels compared at once when narrowing down the changed columns of a row
+SEGMENT_PIXELS = 16
+
+MAX_RUN = 0xFF
+
+
+def changed_rects(old, new, width: int, height: int) -> list:
+    """Rectangles (x, y, w, h) covering every pixel that differs between two frames
+
+    Consecutive changed rows are merged into one rectangle spanning their
+    changed columns. With no previous frame the whole screen is returned.
+    """
+    if old is None:
+        return [(0, 0, width, height)]
+
+    old, new = memoryview(old), memoryview(new)
+    stride = width * BYTES_PER_PIXEL
+    segment = SEGMENT_PIXELS * BYTES_PER_PIXEL
+    offsets = range(0, stride, segment)
+
+    rects = []
+    current = None  # [x0, y0, x1, y1] of the rectangle being grown
+    for y in range(height):
+        start = y * stride
+        old_row, new_row = old[start:start + stride], new[start:start + stride]
+        if old_row == new_row:
+            if current:
+                rects.append(current)
+                current = None
+            continue
+
+        first = next(i for i in offsets if old_row[i:i + segment] != new_row[i:i + segment])
+        last = next(i for i in reversed(offsets) if old_row[i:i + segment] != new_row[i:i + segment])
+        x0 = first // BYTES_PER_PIXEL
+        x1 = min(last + segment, stride) // BYTES_PER_PIXEL
+        if current:
+            current[0] = min(current[0], x0)
+            current[2] = max(current[2], x1)
+            current[3] = y + 1
+        else:
+            current = [x0, y, x1, y + 1]
+    if current:
+        rects.append(current)
+
+    return [(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in rects]
+
+
+def encode_rect(frame, width: int, x: int, y: int, w: int, h: int) -> bytes:
+    """RLE-encode one rectangle of a frame"""
+    pixels = memoryview(frame).cast('H')
+    rows = (pixels[row * width + x:row * width + x + w] for row in range(y, y + h))
+
+    out = bytearray()
+    for value, run in groupby(chain.from_iterable(rows)):
+        count = sum(1 for _ in run)
+        # Native 'H' values hold the framebuffer bytes low byte first
+        lo, hi = value & 0xFF, value >> 8
+        while count > MAX_RUN:
+            out += bytes((MAX_RUN, lo, hi))
+            count -= MAX_RUN
+        out += bytes((count, lo, hi))
+    return bytes(out)
+
+
+def decode_rect(frame: bytearray, width: int, x: int, y: int, w: int, h: int, data: bytes):
+    """Apply one encoded rectangle to a frame (the inverse of encode_rect)"""
+    pixels = bytearray()
+    for i in range(0, len(data), 3):
+        pixels += data[i + 1:i + 3] * data[i]
+
+    row_bytes = w * BYTES_PER_PIXEL
+    for row in range(h):
+        dst = ((y + row) * width + x) * BYTES_PER_PIXEL
+        frame[dst:dst + row_bytes] = pixels[row * row_bytes:(row + 1) * row_bytes]
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Hot-plug recovery for S1 Display
+Reconnects the panel after a USB reset or replug, using udev events on Linux
+and falling back to retrying with backoff
+"""
+
+import select
+import socket
+import struct
+import threading
+import time
+
+# Netlink protocol and multicast groups of kernel uevents
+NETLINK_KOBJECT_UEVENT = 15
+GROUP_KERNEL = 1
+GROUP_UDEV = 2  # Re-sent by udev once its rules (permissions) have been applied
+
+
+class HotplugMonitor:
+    """Reports USB add/remove events for one VID/PID
+
+    Listens on the kernel uevent netlink socket, receiving both the raw
+    kernel events and udev's processed ones. available is False where
+    netlink is not supported (non-Linux), in which case wait() only sleeps.
+    """
+
+    # Messages from udev start with this prefix and a header locating the properties
+    UDEV_PREFIX = b'libudev\0'
+    UDEV_HEADER = struct.Struct('=8sIIII')  # prefix, magic, header size, properties offset, length
+
+    def __init__(self, vid: int, pid: int):
+        self.product = f"{vid:x}/{pid:x}/"  # usb PRODUCT property: vid/pid/bcdDevice
+        self.hid_id = f":{vid:08X}:{pid:08X}"  # hid HID_ID property: bus:vid:pid
+        self._sock = None
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            sock.bind((0, GROUP_KERNEL | GROUP_UDEV))
+            sock.setblocking(False)
+            self._sock = sock
+        except (OSError, AttributeError):
+            # No netlink (non-Linux or restricted); fall back to polling
+            self._sock = None
+
+    @property
+    def available(self) -> bool:
+        return self._sock is not None
+
+    def wait(self, timeout: float) -> set:
+        """Wait up to timeout seconds for events; returns the actions seen ('add', 'remove')"""
+        if self._sock is None:
+            time.sleep(timeout)
+            return set()
+        readable, _, _ = select.select([self._sock], [], [], timeout)
+        if not readable:
+            return set()
+        return self._read_events()
+
+    def _read_events(self) -> set:
+        """Drain pending uevents, keeping the actions that concern the panel"""
+        actions = set()
+        while True:
+            try:
+                data = self._sock.recv(65536)
+            except BlockingIOError:
+                return actions
+            except OSError:
+                # Receive buffer overflowed (ENOBUFS): events were lost, so
+                # report an add to make a disconnected panel be retried
+                actions.add('add')
+                continue
+
+            action = self._match(self._parse(data))
+            if action:
+                actions.add(action)
+
+    def _parse(self, data: bytes) -> dict:
+        """Properties of one uevent, from either the kernel or udev"""
+        if data.startswith(self.UDEV_PREFIX):
+            if len(data) < self.UDEV_HEADER.size:
+                return {}
+            _, _, _, offset, length = self.UDEV_HEADER.unpack_from(data)
+            fields = data[offset:offset + length].split(b'\0')
+        else:
+            # Kernel events start with "action@devpath"
+            fields = data.split(b'\0')[1:]
+
+        properties = {}
+        for field in fields:
+            key, sep, value = field.partition(b'=')
+            if sep:
+                properties[key.decode(errors='replace')] = value.decode(errors='replace')
+        return properties
+
+    def _match(self, properties: dict):
+        """'add' or 'remove' if the event concerns the panel, otherwise None"""
+        action = properties.get('ACTION')
+        if action not in ('add', 'remove'):
+            return None
+        if properties.get('PRODUCT', '').startswith(self.product) or \
+                properties.get('HID_ID', '').upper().endswith(self.hid_id):
+            return action
+        # hidraw nodes carry no IDs of their own; a new one is worth a
+        # reconnect attempt, but a removal may be any device's
+        if properties.get('SUBSYSTEM') == 'hidraw' and action == 'add':
+            return action
+        return None
+
+    def close(self):
+        """Release the netlink socket"""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class DeviceSupervisor:
+    """Background thread that reconnects an S1Display after it is lost
+
+    The display detects a dead device itself (see S1Display.LOST_AFTER_ERRORS)
+    and stops writing to it; a matching USB remove event marks it lost right
+    away. While disconnected, reconnect() is retried with exponential backoff,
+    and immediately when the panel (re)appears.
+    """
+
+    # Retry delays while disconnected (seconds)
+    MIN_BACKOFF = 0.5
+    MAX_BACKOFF = 10.0
+
+    # Longest wait between checks, which bounds how long stop() takes
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self, display):
+        self.display = display
+        self.monitor = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start supervising the display"""
+        if self._thread:
+            return
+        self.monitor = HotplugMonitor(self.display.VID, self.display.PID)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='s1-hotplug', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the supervisor thread"""
+        if not self._thread:
+            return
+        self._running = False
+        self._thread.join()
+        self._thread = None
+        self.monitor.close()
+
+    def _run(self):
+        delay = self.MIN_BACKOFF
+        next_attempt = 0.0
+        while self._running:
+            if self.display.connected:
+                delay = self.MIN_BACKOFF
+                timeout = self.CHECK_INTERVAL
+            else:
+                if time.monotonic() >= next_attempt:
+                    if self.display.reconnect():
+                        continue
+                    next_attempt = time.monotonic() + delay
+                    delay = min(delay * 2, self.MAX_BACKOFF)
+                timeout = min(max(next_attempt - time.monotonic(), 0.0), self.CHECK_INTERVAL)
+
+            events = self.monitor.wait(timeout)
+            if 'remove' in events and self.display.connected:
+                self.display.mark_disconnected("USB device removed")
+            if 'add' in events:
+                # The panel (or a hidraw node) appeared: try right away
+                next_attempt = 0.0
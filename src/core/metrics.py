@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Runtime metrics for S1 Display
+Rolling timing percentiles and counters, rendered in the Prometheus text format
+"""
+
+import threading
+from collections import deque
+
+# Observations kept per timing series for the rolling percentiles
+WINDOW = 512
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def escape_label_value(value: str) -> str:
+    """Escape a label value for the Prometheus text format (backslash, quote, newline)"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    """Thread-safe registry of timings and counters
+
+    Timings are grouped into metrics with one label, e.g. the metric
+    'frame_stage_seconds' with label stage='rasterize'. Each series keeps
+    its last WINDOW observations for percentiles, plus a lifetime count
+    and sum.
+    """
+
+    def __init__(self, prefix: str = 's1', window: int = WINDOW):
+        self.prefix = prefix
+        self.window = window
+        self._lock = threading.Lock()
+        self._timings = {}  # (metric, label, value) -> [deque, count, sum]
+        self._counters = {}  # metric -> value
+        self._help = {}
+
+    def describe(self, metric: str, text: str):
+        """Set the HELP text for a metric"""
+        self._help[metric] = text
+
+    def observe(self, metric: str, label: str, value: str, seconds: float):
+        """Record one timing"""
+        key = (metric, label, value)
+        with self._lock:
+            series = self._timings.get(key)
+            if series is None:
+                series = self._timings[key] = [deque(maxlen=self.window), 0, 0.0]
+            series[0].append(seconds)
+            series[1] += 1
+            series[2] += seconds
+
+    def count(self, metric: str, amount: int = 1):
+        """Increase a counter"""
+        with self._lock:
+            self._counters[metric] = self._counters.get(metric, 0) + amount
+
+    def percentiles(self, metric: str, label: str, value: str) -> dict:
+        """Rolling percentiles {quantile: seconds} of one series (empty if unseen)"""
+        with self._lock:
+            series = self._timings.get((metric, label, value))
+            samples = sorted(series[0]) if series else []
+        if not samples:
+            return {}
+        return {q: samples[min(int(q * len(samples)), len(samples) - 1)] for q in QUANTILES}
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            timings = {key: (sorted(s[0]), s[1], s[2]) for key, s in self._timings.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        by_metric = {}
+        for (metric, label, value), series in sorted(timings.items()):
+            by_metric.setdefault(metric, []).append((label, value, series))
+
+        for metric, entries in by_metric.items():
+            name = f"{self.prefix}_{metric}"
+            if metric in self._help:
+                lines.append(f"# HELP {name} {self._help[metric]}")
+            lines.append(f"# TYPE {name} summary")
+            for label, value, (samples, count, total) in entries:
+                labels = f'{label}="{escape_label_value(value)}"'
+                for q in QUANTILES:
+                    if samples:
+                        sample = samples[min(int(q * len(samples)), len(samples) - 1)]
+                        lines.append(f'{name}{{{labels},quantile="{q}"}} {sample:.6f}')
+                lines.append(f"{name}_sum{{{labels}}} {total:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {count}")
+
+        for metric, value in sorted(counters.items()):
+            name = f"{self.prefix}_{metric}"
+            if metric in self._help:
+                lines.append(f"# HELP {name} {self._help[metric]}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+
+        return '\n'.join(lines) + '\n'
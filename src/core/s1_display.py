@@ -4,11 +4,20 @@ AceMagic S1 TFT Display Driver
 Controls the 320x170 RGB565 display via USB HID
 """
 
-import hid
 import struct
+import sys
+import threading
 import time
+from collections import deque
 from typing import List, Tuple
 
+from core.transports import HidapiTransport
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional; slice fills are used without it
+    numpy = None
+
 
 class S1Display:
     """Driver for AceMagic S1 TFT LCD Display"""
@@ -39,106 +48,382 @@ class S1Display:
     DATA_SIZE = 4096
     PACKET_SIZE = HEADER_SIZE + DATA_SIZE
 
-    def __init__(self):
-        """Initialize connection to S1 display"""
-        self.device = None
-        self.framebuffer = [0] * (self.WIDTH * self.HEIGHT)
+    # HID reports are a packet prefixed with the report ID
+    REPORT_ID = 0x00
+    REPORT_SIZE = 1 + PACKET_SIZE
+    DATA_OFFSET = 1 + HEADER_SIZE  # Start of the data area within a report
+
+    # Preallocated report buffers, reused round robin: a report stays valid
+    # until this many more have been created (the pool grows to a whole
+    # frame's worth when frames are sent as one batch)
+    REPORT_POOL_SIZE = 4
+    MAX_PARAMS = 5
+
+    # Prebuilt reports kept for single-color redraw chunks (the caches are
+    # reset when full; frames rarely use more than a few solid colors)
+    SOLID_CACHE_SIZE = 16
+
+    # Bytes per RGB565 pixel
+    BYTES_PER_PIXEL = 2
+
+    # Partial update tiles describe their width/height in a single byte
+    PARTIAL_MAX_SIZE = 0xFF
+
+    # Dirty rectangles tracked separately before collapsing into one
+    MAX_DIRTY_RECTS = 16
+
+    # Rect fills with at least this many rows go through NumPy when available
+    NUMPY_MIN_ROWS = 8
+
+    # Inter-packet pacing modes
+    PACING_FIXED = 'fixed'        # Sleep packet_delay after every packet
+    PACING_NONE = 'none'          # Send packets back to back
+    PACING_ADAPTIVE = 'adaptive'  # Only back off after failed or stalled writes
+
+    # Adaptive pacing tuning (seconds)
+    STALL_THRESHOLD = 0.05
+    ADAPTIVE_MIN_DELAY = 0.001
+    ADAPTIVE_MAX_DELAY = 0.05
+
+    # Number of recent frames used to compute fps
+    FPS_WINDOW = 30
+
+    # Consecutive failed writes after which the device is considered gone
+    LOST_AFTER_ERRORS = 3
+
+    # Pause after setting the orientation before sending a frame
+    ORIENTATION_SETTLE = 0.1
+
+    def __init__(self, partial_updates: bool = False, shadow_frame: bool = False,
+                 pacing: str = PACING_FIXED, packet_delay: float = 0.01, transport=None,
+                 metrics=None):
+        """Initialize connection to S1 display
+
+        transport carries the packets (see core.transports); the default
+        opens the real panel through hidapi.
+
+        metrics (a core.metrics.Metrics) receives each frame's timing
+        breakdown and packet counts.
+
+        With partial_updates enabled, drawing calls record dirty rectangles
+        and update_display() sends only those regions when that takes fewer
+        packets than a full redraw.
+
+        With shadow_frame enabled, the last transmitted frame is kept and
+        update_display() skips packets whose pixels have not changed.
+
+        pacing selects how long to wait between packets: 'fixed' sleeps
+        packet_delay seconds, 'none' never sleeps and 'adaptive' measures
+        each HID write and only backs off when writes fail or stall.
+        """
+        if pacing not in (self.PACING_FIXED, self.PACING_NONE, self.PACING_ADAPTIVE):
+            raise ValueError(f"Unknown pacing mode: {pacing}")
+
+        self.transport = transport if transport is not None else HidapiTransport(self.VID, self.PID)
+        self.device = None  # The transport while connected
+        self.orientation = None  # Last orientation set, replayed by reconnect()
+        # Framebuffer holds pixels exactly as they are sent over USB
+        # (little-endian 16-bit), so packet payloads are plain slice copies
+        self.framebuffer = bytearray(self.WIDTH * self.HEIGHT * self.BYTES_PER_PIXEL)
+        self._pixels = memoryview(self.framebuffer).cast('H')
+        # 2D pixel view for rectangle fills when NumPy is available
+        self._array = None
+        if numpy is not None:
+            self._array = numpy.frombuffer(self.framebuffer, dtype='<u2').reshape(self.HEIGHT, self.WIDTH)
+
+        # Dirty region tracking: (x0, y0, x1, y1) with exclusive end bounds
+        self._partial_updates = partial_updates
+        self._dirty: List[Tuple[int, int, int, int]] = []
+        self._full_dirty = True
+
+        # Copy of the last transmitted frame (None until one has been sent)
+        self._shadow_frame = shadow_frame
+        self._shadow = None
+
+        # Packet pacing and frame timing
+        self.pacing = pacing
+        self.packet_delay = packet_delay
+        self._adaptive_delay = 0.0
+        self._last_write_duration = 0.0
+        self._frame_times = deque(maxlen=self.FPS_WINDOW)
+        self.last_frame_duration = 0.0
+
+        # Packet counters (lifetime) and the current frame's write/sleep time
+        self.metrics = metrics
+        self.packets_sent = 0
+        self.packets_skipped = 0  # Full redraw packets avoided by partial/shadow updates
+        self.write_errors = 0
+        self._consecutive_errors = 0
+
+        # Report buffers with the report ID and signature filled in once,
+        # held as memoryviews: copying a memoryview into a bytearray slice
+        # would go through a temporary copy, into a memoryview it does not
+        self._report_pool = []
+        self._grow_report_pool(self.REPORT_POOL_SIZE)
+        self._report_index = 0
+        self._zero_data = memoryview(bytes(self.DATA_SIZE))
+
+        # Reports of the frame being sent, when the transport takes them all
+        # at once (see _start_batch()); None while writing one by one
+        self._batch = None
+
+        # Single-color chunks (mostly background): (pixel, length) -> chunk
+        # data, and (cmd, pixel, length) -> complete report ready to send
+        self._solid_data = {}
+        self._solid_reports = {}
+        self.solid_packets = 0  # Redraw packets sent from a prebuilt report
+        self._frame_write_time = 0.0
+        self._frame_sleep_time = 0.0
+
+        # Background transmission (see start_async()); the device lock keeps
+        # commands from interleaving with a frame's packet sequence
+        self._device_lock = threading.RLock()
+        self._tx_cond = threading.Condition()
+        self._tx_thread = None
+        self._tx_running = False
+        self._pending = None
+        self._free_buffers = [bytearray(len(self.framebuffer)) for _ in range(2)]
+        self.frames_dropped = 0
 
     def connect(self) -> bool:
-        """Connect to the S1 display device"""
-        try:
-            # Enumerate all matching devices
-            devices = hid.enumerate(self.VID, self.PID)
-
-            if not devices:
-                print(f"No devices found with VID={hex(self.VID)}, PID={hex(self.PID)}")
-                print("\nTroubleshooting:")
-                print("1. Check if device is connected: lsusb | grep 04d9:fd01")
-                print("2. You may need to run with sudo")
-                print("3. Or install udev rules (see 99-s1-display.rules)")
+        """Connect to the S1 display device (through the configured transport)"""
+        # Panel contents are unknown after (re)connecting
+        self._shadow = None
+        if not self.transport.open():
+            return False
+        self.device = self.transport
+        return True
+
+    @property
+    def connected(self) -> bool:
+        """Whether the device is open (False after it was lost, until reconnect())"""
+        return self.device is not None
+
+    def reconnect(self) -> bool:
+        """Reopen a lost device and restore what it showed
+
+        Replays the last orientation and the current framebuffer as a full
+        redraw, since the panel's contents are lost with the connection.
+        Returns True if the device is connected afterwards.
+        """
+        with self._device_lock:
+            if self.device:
+                return True
+            if not self.connect():
                 return False
+            self._consecutive_errors = 0
+            if self.orientation is not None:
+                self._send_packet(self._create_packet(self.CMD_SET_ORIENTATION, [self.orientation]))
+                time.sleep(self.ORIENTATION_SETTLE)
+            frame = bytearray(self.framebuffer)
+            connected = self._send_full_redraw(frame)
+            if connected:
+                self._update_shadow(frame)
+        if connected:
+            print("Display reconnected, last frame restored")
+            if self.metrics:
+                self.metrics.count('display_reconnects_total')
+        return connected
+
+    def mark_disconnected(self, reason: str):
+        """Treat the device as gone (e.g. on a USB remove event) until reconnect()"""
+        with self._device_lock:
+            if self.device:
+                self._lose_device(reason)
 
-            print(f"Found {len(devices)} device interface(s)")
-
-            # Try each interface
-            for idx, dev in enumerate(devices):
-                print(f"\nInterface {idx}:")
-                print(f"  Path: {dev['path']}")
-                print(f"  Manufacturer: {dev['manufacturer_string']}")
-                print(f"  Product: {dev['product_string']}")
-                print(f"  Usage Page: {hex(dev['usage_page'])}")
-                print(f"  Usage: {hex(dev['usage'])}")
-                print(f"  Interface: {dev['interface_number']}")
-
-                # Skip consumer control interface (usage_page 0x0C)
-                # We want the vendor-defined interface
-                if dev['usage_page'] == 0x0C:
-                    print("  -> Skipping (consumer control interface)")
-                    continue
-
-                # Try to open this interface
-                try:
-                    print("  -> Attempting to open...")
-                    self.device = hid.device()
-                    self.device.open_path(dev['path'])
-                    print(f"  -> Successfully opened!")
-                    print(f"\nConnected to S1 Display: {dev['product_string']}")
-                    return True
-                except Exception as open_error:
-                    print(f"  -> Failed to open: {open_error}")
-                    self.device = None
-                    continue
-
-            print("\nFailed to open any suitable interface")
-            print("\nIf you see 'Permission denied' errors:")
-            print("1. Run with sudo: sudo python3 test_display.py")
-            print("2. Or install udev rules: sudo cp 99-s1-display.rules /etc/udev/rules.d/")
-            return False
+    def _lose_device(self, reason: str):
+        """Close a device that stopped responding; must hold the device lock
 
-        except Exception as e:
-            print(f"Error during device enumeration: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
+        Frames are dropped from here on instead of being written to a dead
+        handle, until reconnect() reopens the transport.
+        """
+        print(f"Display connection lost ({reason})")
+        try:
+            self.device.close()
+        except Exception:
+            pass
+        self.device = None
+        self._shadow = None
+        if self.metrics:
+            self.metrics.count('display_disconnects_total')
 
     def disconnect(self):
         """Disconnect from the device"""
+        self.stop_async()
         if self.device:
             self.device.close()
             self.device = None
 
-    def _create_packet(self, cmd: Tuple[int, int], params: List[int] = None) -> bytearray:
-        """Create a command packet with header and data payload"""
-        packet = bytearray(self.PACKET_SIZE)
-
-        # Header: signature (0x55) + command bytes
-        packet[0] = 0x55
-        packet[1] = cmd[0]
-        packet[2] = cmd[1]
-
-        # Add parameters if provided
-        if params:
-            for i, param in enumerate(params[:5]):  # Max 5 param bytes
-                packet[3 + i] = param
-
-        return packet
-
-    def _send_packet(self, packet: bytearray) -> bool:
-        """Send a packet to the device"""
+    def _create_packet(self, cmd: Tuple[int, int], params: List[int] = None,
+                       data_length: int = 0) -> memoryview:
+        """Prepare the next pooled report: report ID, header and data area
+
+        Returns a view of the report buffer. The caller writes data_length
+        bytes of data in place starting at DATA_OFFSET; the rest of the data
+        area is zeroed. Must be called with the device lock held, as the pool
+        is shared between threads.
+        """
+        report = self._report_pool[self._report_index]
+        self._report_index = (self._report_index + 1) % len(self._report_pool)
+
+        # Header: report ID and signature (0x55) are preset; command bytes + params
+        report[2] = cmd[0]
+        report[3] = cmd[1]
+        params = params[:self.MAX_PARAMS] if params else []
+        report[4:4 + self.MAX_PARAMS] = bytes(params) + bytes(self.MAX_PARAMS - len(params))
+
+        report[self.DATA_OFFSET + data_length:] = self._zero_data[data_length:]
+        return report
+
+    def _grow_report_pool(self, size: int):
+        """Add preset report buffers until the pool holds size of them"""
+        while len(self._report_pool) < size:
+            report = bytearray(self.REPORT_SIZE)
+            report[0] = self.REPORT_ID
+            report[1] = 0x55
+            self._report_pool.append(memoryview(report))
+
+    def _send_packet(self, report: memoryview) -> bool:
+        """Send a report (from _create_packet) to the device as-is
+
+        While a batch is open the report is queued instead, and written
+        by _flush_batch().
+        """
         try:
             if self.device:
-                # HID write requires prepending report ID (0x00)
-                self.device.write(bytes([0x00]) + packet)
-                return True
+                if self._batch is not None:
+                    self._batch.append(report.obj)
+                    return True
+                start = time.perf_counter()
+                written = self.device.write(report.obj)
+                self._last_write_duration = time.perf_counter() - start
+                self._frame_write_time += self._last_write_duration
+                # hidapi reports failed writes as -1 rather than raising
+                if written >= 0:
+                    self.packets_sent += 1
+                    self._consecutive_errors = 0
+                    return True
+                self._count_write_error()
             return False
         except Exception as e:
             print(f"Error sending packet: {e}")
+            self._count_write_error()
             return False
 
+    def _start_batch(self):
+        """Queue the frame's reports for a single write_many() call
+
+        Only used without pacing, as there is nothing to wait for between
+        packets. The report pool grows so that no report of the frame is
+        reused before the batch is written.
+        """
+        self._grow_report_pool(self._full_redraw_packet_count())
+        self._batch = []
+
+    def _flush_batch(self):
+        """Write the queued reports, counting a failed write if they did not all go out"""
+        reports, self._batch = self._batch, None
+        if not reports or not self.device:
+            return
+        start = time.perf_counter()
+        try:
+            sent = self.device.write_many(reports)
+        except Exception as e:
+            print(f"Error sending packets: {e}")
+            sent = 0
+        self._last_write_duration = time.perf_counter() - start
+        self._frame_write_time += self._last_write_duration
+        self.packets_sent += sent
+        if sent:
+            self._consecutive_errors = 0
+        if sent < len(reports):
+            # The batch stops at the report that failed; the rest were not
+            # attempted, so this counts as one failed write
+            self._count_write_error()
+
+    def _count_write_error(self):
+        self.write_errors += 1
+        self._consecutive_errors += 1
+        if self.metrics:
+            self.metrics.count('hid_write_errors_total')
+        if self._consecutive_errors >= self.LOST_AFTER_ERRORS:
+            self._lose_device(f"{self._consecutive_errors} failed writes")
+
+    def _pace(self, sent: bool):
+        """Wait between packets according to the pacing mode"""
+        if self.pacing == self.PACING_NONE:
+            return
+
+        if self.pacing == self.PACING_FIXED:
+            delay = self.packet_delay
+        else:
+            if not sent or self._last_write_duration > self.STALL_THRESHOLD:
+                # Back off exponentially while the device is struggling
+                delay = min(max(self._adaptive_delay * 2, self.ADAPTIVE_MIN_DELAY),
+                            self.ADAPTIVE_MAX_DELAY)
+            else:
+                # Recover towards back to back writes
+                delay = self._adaptive_delay / 2
+                if delay < self.ADAPTIVE_MIN_DELAY:
+                    delay = 0.0
+            self._adaptive_delay = delay
+
+        if delay > 0:
+            start = time.perf_counter()
+            time.sleep(delay)
+            self._frame_sleep_time += time.perf_counter() - start
+
+    @property
+    def partial_updates(self) -> bool:
+        return self._partial_updates
+
+    @partial_updates.setter
+    def partial_updates(self, enabled: bool):
+        if enabled != self._partial_updates:
+            self._partial_updates = enabled
+            self._reset_sent_state()
+
+    @property
+    def shadow_frame(self) -> bool:
+        return self._shadow_frame
+
+    @shadow_frame.setter
+    def shadow_frame(self, enabled: bool):
+        if enabled != self._shadow_frame:
+            self._shadow_frame = enabled
+            self._reset_sent_state()
+
+    def _reset_sent_state(self):
+        """Forget what the panel is known to show, so the next frame is sent whole
+
+        Used when an update mode changes (a shadow copy kept from before may
+        no longer match the panel, and dirty regions were not tracked) and
+        when a frame's writes failed. A frame waiting for the transmit
+        thread is marked fully dirty too. Dirty rects are left in place, as
+        the full flag supersedes them.
+        """
+        with self._device_lock, self._tx_cond:
+            self._shadow = None
+            self._full_dirty = True
+            if self._pending:
+                buffer, dirty, _ = self._pending
+                self._pending = (buffer, dirty, True)
+
+    @property
+    def fps(self) -> float:
+        """Frames per second achieved by recent update_display() calls"""
+        if len(self._frame_times) < 2:
+            return 0.0
+        elapsed = self._frame_times[-1] - self._frame_times[0]
+        if elapsed <= 0:
+            return 0.0
+        return (len(self._frame_times) - 1) / elapsed
+
     def set_orientation(self, orientation: int = ORIENTATION_LANDSCAPE):
         """Set display orientation (0x01 = landscape, 0x02 = portrait)"""
-        packet = self._create_packet(self.CMD_SET_ORIENTATION, [orientation])
-        self._send_packet(packet)
+        with self._device_lock:
+            self.orientation = orientation
+            self._send_packet(self._create_packet(self.CMD_SET_ORIENTATION, [orientation]))
 
     def send_heartbeat(self):
         """Send heartbeat to maintain internal clock and animations"""
@@ -150,8 +435,8 @@ class S1Display:
             current_time.tm_hour,         # Hour
             current_time.tm_min           # Minute
         ]
-        packet = self._create_packet(self.CMD_HEARTBEAT, params)
-        self._send_packet(packet)
+        with self._device_lock:
+            self._send_packet(self._create_packet(self.CMD_HEARTBEAT, params))
 
     @staticmethod
     def rgb565(r: int, g: int, b: int) -> int:
@@ -167,33 +452,331 @@ class S1Display:
         # Swap endianness
         return ((rgb >> 8) | (rgb << 8)) & 0xFFFF
 
+    @staticmethod
+    def _native(color: int) -> int:
+        """Convert a wire-order (little-endian) color to the host's 16-bit order"""
+        if sys.byteorder == 'big':
+            return ((color >> 8) | (color << 8)) & 0xFFFF
+        return color
+
     def clear(self, r: int = 0, g: int = 0, b: int = 0):
         """Clear framebuffer to specified color"""
         color = self.rgb565(r, g, b)
-        self.framebuffer = [color] * (self.WIDTH * self.HEIGHT)
+        if self._array is not None:
+            self._array.fill(color)
+        else:
+            self.framebuffer[:] = color.to_bytes(2, 'little') * (self.WIDTH * self.HEIGHT)
+        self._full_dirty = True
+        self._dirty = []
 
     def set_pixel(self, x: int, y: int, r: int, g: int, b: int):
         """Set a pixel in the framebuffer"""
         if 0 <= x < self.WIDTH and 0 <= y < self.HEIGHT:
             color = self.rgb565(r, g, b)
-            self.framebuffer[y * self.WIDTH + x] = color
+            self._pixels[y * self.WIDTH + x] = self._native(color)
+            self._mark_dirty(x, y, x + 1, y + 1)
 
     def fill_rect(self, x: int, y: int, width: int, height: int, r: int, g: int, b: int):
-        """Fill a rectangle in the framebuffer"""
+        """Fill a rectangle in the framebuffer (clipped to the screen)"""
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, self.WIDTH), min(y + height, self.HEIGHT)
+        if x0 >= x1 or y0 >= y1:
+            return
+
         color = self.rgb565(r, g, b)
-        for py in range(y, min(y + height, self.HEIGHT)):
-            for px in range(x, min(x + width, self.WIDTH)):
-                self.framebuffer[py * self.WIDTH + px] = color
+        if self._array is not None and y1 - y0 >= self.NUMPY_MIN_ROWS:
+            self._array[y0:y1, x0:x1] = color
+        else:
+            # One slice assignment per row
+            row = color.to_bytes(2, 'little') * (x1 - x0)
+            stride = self.WIDTH * self.BYTES_PER_PIXEL
+            start = (y0 * self.WIDTH + x0) * self.BYTES_PER_PIXEL
+            end = start + len(row)
+            fb = self.framebuffer
+            for _ in range(y1 - y0):
+                fb[start:end] = row
+                start += stride
+                end += stride
+        self._mark_dirty(x0, y0, x1, y1)
+
+    def blit(self, x: int, y: int, width: int, height: int, buffer):
+        """Copy a block of pixels into the framebuffer (clipped to the screen)
+
+        buffer holds width * height pixels row by row in framebuffer format
+        (little-endian RGB565, as produced by rgb565()).
+        """
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, self.WIDTH), min(y + height, self.HEIGHT)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        src = memoryview(buffer).cast('B')
+        if len(src) < width * height * self.BYTES_PER_PIXEL:
+            raise ValueError(f"blit buffer too small for {width}x{height} pixels")
+
+        src_stride = width * self.BYTES_PER_PIXEL
+        dst_stride = self.WIDTH * self.BYTES_PER_PIXEL
+        row_bytes = (x1 - x0) * self.BYTES_PER_PIXEL
+        src_start = ((y0 - y) * width + (x0 - x)) * self.BYTES_PER_PIXEL
+        dst_start = (y0 * self.WIDTH + x0) * self.BYTES_PER_PIXEL
+        fb = self.framebuffer
+        for _ in range(y1 - y0):
+            fb[dst_start:dst_start + row_bytes] = src[src_start:src_start + row_bytes]
+            src_start += src_stride
+            dst_start += dst_stride
+        self._mark_dirty(x0, y0, x1, y1)
+
+    def make_span(self, dx: int, dy: int, pixels: bytes) -> tuple:
+        """Build a span for blit_spans(): a run of framebuffer-format pixels at (dx, dy)"""
+        return ((dy * self.WIDTH + dx) * self.BYTES_PER_PIXEL, dx, dy, pixels)
+
+    def blit_spans(self, x: int, y: int, spans, width: int, height: int):
+        """Copy pre-rendered horizontal pixel runs into the framebuffer
+
+        spans come from make_span() and are relative to (x, y); width/height
+        bound all of the spans.
+        """
+        if not spans:
+            return
+
+        fb = self.framebuffer
+        if x >= 0 and y >= 0 and x + width <= self.WIDTH and y + height <= self.HEIGHT:
+            # Fully on screen: spans carry their framebuffer offset
+            base = (y * self.WIDTH + x) * self.BYTES_PER_PIXEL
+            for offset, _, _, pixels in spans:
+                start = base + offset
+                fb[start:start + len(pixels)] = pixels
+        else:
+            for _, dx, dy, pixels in spans:
+                py = y + dy
+                if not 0 <= py < self.HEIGHT:
+                    continue
+                px0 = x + dx
+                px1 = px0 + len(pixels) // self.BYTES_PER_PIXEL
+                lo, hi = max(px0, 0), min(px1, self.WIDTH)
+                if lo >= hi:
+                    continue
+                start = (py * self.WIDTH + lo) * self.BYTES_PER_PIXEL
+                fb[start:start + (hi - lo) * self.BYTES_PER_PIXEL] = \
+                    pixels[(lo - px0) * self.BYTES_PER_PIXEL:(hi - px0) * self.BYTES_PER_PIXEL]
+        self._mark_dirty(x, y, x + width, y + height)
+
+    def _mark_dirty(self, x0: int, y0: int, x1: int, y1: int):
+        """Record a changed framebuffer region for the next partial update"""
+        if not self.partial_updates or self._full_dirty:
+            return
+
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, self.WIDTH), min(y1, self.HEIGHT)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        # Merge with any rect this one overlaps or touches; glyph cells of
+        # one line of text collapse into a single rect this way
+        rects = self._dirty
+        idx = len(rects) - 1
+        while idx >= 0:
+            rx0, ry0, rx1, ry1 = rects[idx]
+            if x0 <= rx1 and rx0 <= x1 and y0 <= ry1 and ry0 <= y1:
+                x0, y0 = min(x0, rx0), min(y0, ry0)
+                x1, y1 = max(x1, rx1), max(y1, ry1)
+                del rects[idx]
+                idx = len(rects) - 1
+                continue
+            idx -= 1
+        rects.append((x0, y0, x1, y1))
+
+        if len(rects) > self.MAX_DIRTY_RECTS:
+            self._dirty = [self._bounding_rect(rects)]
+
+    @staticmethod
+    def _bounding_rect(rects: List[Tuple[int, int, int, int]]) -> Tuple[int, int, int, int]:
+        """Smallest rect containing all of the given rects"""
+        return (min(r[0] for r in rects), min(r[1] for r in rects),
+                max(r[2] for r in rects), max(r[3] for r in rects))
+
+    def _partial_tiles(self, dirty: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+        """Split dirty rects into (x, y, width, height) tiles of one packet each"""
+        pixels_per_packet = self.DATA_SIZE // self.BYTES_PER_PIXEL
+        tiles = []
+        for x0, y0, x1, y1 in dirty:
+            for tx in range(x0, x1, self.PARTIAL_MAX_SIZE):
+                width = min(self.PARTIAL_MAX_SIZE, x1 - tx)
+                rows = min(pixels_per_packet // width, self.PARTIAL_MAX_SIZE)
+                for ty in range(y0, y1, rows):
+                    tiles.append((tx, ty, width, min(rows, y1 - ty)))
+        return tiles
+
+    def _send_partial(self, frame: bytearray, x: int, y: int, width: int, height: int) -> bool:
+        """Send one rectangular region using the partial update command
+
+        Header params: x (16-bit little-endian), y, width, height; the payload
+        is the region's rows packed back to back.
+        """
+        row_bytes = width * self.BYTES_PER_PIXEL
+        report = self._create_packet(self.CMD_PARTIAL_UPDATE,
+                                     [x & 0xFF, x >> 8, y, width, height],
+                                     row_bytes * height)
+        frame = memoryview(frame)
+        offset = self.DATA_OFFSET
+        for py in range(y, y + height):
+            start = (py * self.WIDTH + x) * self.BYTES_PER_PIXEL
+            report[offset:offset + row_bytes] = frame[start:start + row_bytes]
+            offset += row_bytes
+        return self._send_packet(report)
+
+    def _full_redraw_packet_count(self) -> int:
+        """Number of packets needed to send the whole framebuffer"""
+        return (len(self.framebuffer) + self.DATA_SIZE - 1) // self.DATA_SIZE
 
     def update_display(self):
-        """Send full framebuffer to display using full redraw"""
+        """Send framebuffer to display
+
+        Uses partial updates for the dirty regions when enabled and cheaper,
+        otherwise falls back to a full redraw. In shadow frame mode nothing is
+        sent for an unchanged frame, and a full redraw stops after the last
+        changed packet.
+
+        While the transmit thread is running (see start_async()), the frame is
+        queued instead and this returns immediately.
+        """
+        if self._tx_thread:
+            self._submit_frame()
+        else:
+            dirty, full_dirty = self._dirty, self._full_dirty
+            self._dirty, self._full_dirty = [], False
+            self._present(self.framebuffer, dirty, full_dirty)
+
+    def _present(self, frame: bytearray, dirty: List[Tuple[int, int, int, int]], full_dirty: bool):
+        """Transmit one frame and record its timing"""
+        if not self.device:
+            # Disconnected: reconnect() sends the latest framebuffer instead
+            return
+        start = time.perf_counter()
+        with self._device_lock:
+            self._frame_write_time = self._frame_sleep_time = 0.0
+            sent_before = self.packets_sent
+            errors_before = self.write_errors
+            if self.pacing == self.PACING_NONE and getattr(self.device, 'batch_writes', False):
+                self._start_batch()
+            transmitted = False
+            try:
+                transmitted = self._transmit_frame(frame, dirty, full_dirty)
+            finally:
+                self._flush_batch()
+            if self.write_errors != errors_before:
+                # Some of the frame never reached the panel: the shadow copy
+                # and the dirty rects no longer describe what it shows
+                self._reset_sent_state()
+            elif transmitted:
+                self._update_shadow(frame)
+            sent = self.packets_sent - sent_before
+            write_time, sleep_time = self._frame_write_time, self._frame_sleep_time
+        now = time.perf_counter()
+        self.last_frame_duration = now - start
+        self._frame_times.append(now)
+
+        skipped = max(self._full_redraw_packet_count() - sent, 0)
+        self.packets_skipped += skipped
+        if self.metrics:
+            metrics = self.metrics
+            metrics.observe('frame_stage_seconds', 'stage', 'transmit', self.last_frame_duration)
+            metrics.observe('frame_stage_seconds', 'stage', 'packet_build',
+                            max(self.last_frame_duration - write_time - sleep_time, 0.0))
+            metrics.observe('frame_stage_seconds', 'stage', 'hid_write', write_time)
+            metrics.observe('frame_stage_seconds', 'stage', 'sleep', sleep_time)
+            metrics.count('frames_sent_total')
+            metrics.count('packets_sent_total', sent)
+            metrics.count('packets_skipped_total', skipped)
+
+    def _transmit_frame(self, frame: bytearray, dirty: List[Tuple[int, int, int, int]], full_dirty: bool):
+        """Send a frame using the cheapest update its dirty state allows
+
+        Returns False if nothing needed sending (the shadow frame matched).
+        """
+        num_packets = self._full_redraw_packet_count()
+
+        if self.shadow_frame and self._shadow is not None:
+            changed = self._changed_chunks(frame)
+            if not changed:
+                return False
+
+            # The redraw sequence always starts at the top of the frame, so
+            # the shortest valid one ends at the last changed packet
+            num_packets = max(changed[-1] + 1, 2)
+
+            if self.partial_updates and full_dirty:
+                # Narrow a full-frame invalidation down to the rows that differ
+                dirty = self._chunk_rects(changed)
+                full_dirty = False
+
+        if self.partial_updates and not full_dirty:
+            tiles = self._partial_tiles(dirty)
+            if len(tiles) < num_packets:
+                for tile in tiles:
+                    if not self.device:
+                        # Lost mid-frame: stop rather than pace through the rest
+                        break
+                    self._pace(self._send_partial(frame, *tile))
+                return True
+
+        self._send_full_redraw(frame, num_packets)
+        return True
+
+    def _changed_chunks(self, frame: bytearray) -> List[int]:
+        """Indices of full redraw packets whose payload differs from the shadow frame
+
+        Each chunk is compared in place (startswith against a view of the
+        shadow), as slicing would copy both chunks and comparing two
+        memoryviews goes item by item.
+        """
+        shadow = memoryview(self._shadow)
+        changed = []
+        for idx in range(self._full_redraw_packet_count()):
+            start = idx * self.DATA_SIZE
+            if not frame.startswith(shadow[start:start + self.DATA_SIZE], start):
+                changed.append(idx)
+        return changed
+
+    def _chunk_rects(self, chunks: List[int]) -> List[Tuple[int, int, int, int]]:
+        """Convert changed packet indices into full-width row bands"""
+        row_bytes = self.WIDTH * self.BYTES_PER_PIXEL
+        rects = []
+        for idx in chunks:
+            y0 = idx * self.DATA_SIZE // row_bytes
+            y1 = min(-(-(idx + 1) * self.DATA_SIZE // row_bytes), self.HEIGHT)
+            if rects and rects[-1][3] >= y0:
+                rects[-1] = (0, rects[-1][1], self.WIDTH, y1)
+            else:
+                rects.append((0, y0, self.WIDTH, y1))
+        return rects
+
+    def _update_shadow(self, frame: bytearray):
+        """Remember the frame just transmitted"""
+        if not self.shadow_frame:
+            return
+        if self._shadow is None:
+            self._shadow = bytearray(frame)
+        else:
+            self._shadow[:] = frame
+
+    def _send_full_redraw(self, frame: bytearray, num_packets: int = None):
+        """Send a frame to display using full redraw
+
+        num_packets limits the sequence to the leading packets of the frame.
+        Returns False if the device was lost before the frame was complete.
+        """
         # Send framebuffer in chunks
         # Each packet can hold 2048 pixels (4096 bytes / 2 bytes per pixel)
-        pixels_per_packet = self.DATA_SIZE // 2
-        total_pixels = self.WIDTH * self.HEIGHT
-        num_packets = (total_pixels + pixels_per_packet - 1) // pixels_per_packet
+        if num_packets is None:
+            num_packets = self._full_redraw_packet_count()
+        frame = memoryview(frame)
 
         for packet_idx in range(num_packets):
+            if not self.device:
+                # Lost mid-frame: stop rather than pace through the rest
+                return False
+
             # Determine command type based on position
             if packet_idx == 0:
                 cmd = self.CMD_FULL_REDRAW_START
@@ -202,24 +785,118 @@ class S1Display:
             else:
                 cmd = self.CMD_FULL_REDRAW_CONTINUE
 
-            # Create packet
-            packet = self._create_packet(cmd)
-
-            # Fill data portion with pixel data
-            start_pixel = packet_idx * pixels_per_packet
-            end_pixel = min(start_pixel + pixels_per_packet, total_pixels)
-
-            data_offset = self.HEADER_SIZE
-            for pixel_idx in range(start_pixel, end_pixel):
-                color = self.framebuffer[pixel_idx]
-                # Pack as little-endian 16-bit value
-                packet[data_offset] = color & 0xFF
-                packet[data_offset + 1] = (color >> 8) & 0xFF
-                data_offset += 2
+            start = packet_idx * self.DATA_SIZE
+            chunk = frame[start:start + self.DATA_SIZE]
+            report = self._solid_report(frame.obj, cmd, start, len(chunk))
+            if report is None:
+                # Fill a pooled report's data area with pixel data (already little-endian)
+                report = self._create_packet(cmd, data_length=len(chunk))
+                report[self.DATA_OFFSET:self.DATA_OFFSET + len(chunk)] = chunk
+            else:
+                self.solid_packets += 1
 
             # Send packet
-            self._send_packet(packet)
-            time.sleep(0.01)  # Small delay between packets
+            self._pace(self._send_packet(report))
+        return self.device is not None
+
+    def _solid_report(self, frame: bytearray, cmd: Tuple[int, int], start: int, length: int):
+        """Prebuilt report for a redraw chunk that is a single color, or None
+
+        Candidate chunks must start and end with the same pixel; they are then
+        compared in place against a cached run of that pixel, so neither the
+        check nor the send copies or allocates once a color has been seen.
+        """
+        end = start + length
+        pixel = frame[start] | (frame[start + 1] << 8)
+        if frame[end - 2] != frame[start] or frame[end - 1] != frame[start + 1]:
+            return None
+
+        data_key = (pixel, length)
+        data = self._solid_data.get(data_key)
+        if data is None:
+            if len(self._solid_data) >= self.SOLID_CACHE_SIZE:
+                self._solid_data.clear()
+            data = bytes(frame[start:start + self.BYTES_PER_PIXEL]) * (length // self.BYTES_PER_PIXEL)
+            self._solid_data[data_key] = data
+        if not frame.startswith(data, start):
+            return None
+
+        report_key = (cmd, pixel, length)
+        report = self._solid_reports.get(report_key)
+        if report is None:
+            if len(self._solid_reports) >= self.SOLID_CACHE_SIZE:
+                self._solid_reports.clear()
+            buffer = bytearray(self.REPORT_SIZE)
+            buffer[0] = self.REPORT_ID
+            buffer[1:4] = bytes((0x55, cmd[0], cmd[1]))
+            buffer[self.DATA_OFFSET:self.DATA_OFFSET + length] = data
+            report = memoryview(buffer)
+            self._solid_reports[report_key] = report
+        return report
+
+    def start_async(self):
+        """Start the background transmit thread
+
+        update_display() then snapshots the framebuffer into a back buffer
+        and returns, so the caller can draw the next frame while this one is
+        sent. A frame still waiting when a newer one arrives is replaced.
+        """
+        if self._tx_thread:
+            return
+        self._tx_running = True
+        self._tx_thread = threading.Thread(target=self._tx_loop, name='s1-transmit', daemon=True)
+        self._tx_thread.start()
+
+    def stop_async(self):
+        """Stop the transmit thread after sending any frame still waiting"""
+        if not self._tx_thread:
+            return
+        with self._tx_cond:
+            self._tx_running = False
+            self._tx_cond.notify()
+        self._tx_thread.join()
+        self._tx_thread = None
+
+    def _submit_frame(self):
+        """Hand the current framebuffer and its dirty state to the transmit thread
+
+        The dirty state is taken under the lock, as the transmit thread may
+        set _full_dirty after a failed frame.
+        """
+        with self._tx_cond:
+            dirty, full_dirty = self._dirty, self._full_dirty
+            self._dirty, self._full_dirty = [], False
+            if self._pending:
+                # Replace the waiting frame, keeping the regions it changed
+                buffer, pending_dirty, pending_full = self._pending
+                dirty = pending_dirty + dirty
+                full_dirty = full_dirty or pending_full
+                if len(dirty) > self.MAX_DIRTY_RECTS:
+                    dirty = [self._bounding_rect(dirty)]
+                self.frames_dropped += 1
+                if self.metrics:
+                    self.metrics.count('frames_dropped_total')
+            else:
+                buffer = self._free_buffers.pop()
+            buffer[:] = self.framebuffer
+            self._pending = (buffer, dirty, full_dirty)
+            self._tx_cond.notify()
+
+    def _tx_loop(self):
+        """Transmit thread: send the newest submitted frame until stopped"""
+        while True:
+            with self._tx_cond:
+                while not self._pending and self._tx_running:
+                    self._tx_cond.wait()
+                if not self._pending:
+                    return
+                frame, dirty, full_dirty = self._pending
+                self._pending = None
+
+            self._present(frame, dirty, full_dirty)
+
+            with self._tx_cond:
+                self._free_buffers.append(frame)
 
     def __enter__(self):
         """Context manager entry"""
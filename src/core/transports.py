@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Packet transports for S1 Display
+Where S1Display sends its HID reports: the real panel, or a stand-in for
+headless rendering, benchmarking and tests
+
+Every transport has the hidapi device interface S1Display uses: open() to
+connect, write(report) with the report ID as the first byte (returning the
+number of bytes written, or -1 on failure) and close(). Transports that
+can send several reports at once set batch_writes and have
+write_many(reports), returning the number of reports written.
+"""
+
+import json
+import os
+import struct
+import time
+
+try:
+    import hid
+except ImportError:  # hidapi is only needed for the real panel
+    hid = None
+
+# Where HidapiTransport remembers the panel's interface path between runs
+DEFAULT_PATH_CACHE = '/var/cache/s1-display/device-path.json'
+
+# Packet layout (see S1Display)
+REPORT_ID_SIZE = 1
+HEADER_SIZE = 8
+DATA_SIZE = 4096
+
+# Header signature and command bytes
+SIGNATURE = 0x55
+CMD_SET_ORIENTATION = (0xA1, 0xF1)
+CMD_HEARTBEAT = (0xA1, 0xF3)
+CMD_PARTIAL_UPDATE = (0xA2, 0xF0)
+CMD_FULL_REDRAW_START = (0xA3, 0xF0)
+CMD_FULL_REDRAW_CONTINUE = (0xA3, 0xF1)
+CMD_FULL_REDRAW_END = (0xA3, 0xF2)
+
+
+def _hidraw_usage_page(path: bytes):
+    """Top-level usage page of a Linux hidraw node, from its report descriptor
+
+    Returns None when path is not a hidraw node or the descriptor cannot be read.
+    """
+    name = os.path.basename(path)
+    if not path.startswith(b'/dev/hidraw'):
+        return None
+    try:
+        with open(b'/sys/class/hidraw/' + name + b'/device/report_descriptor', 'rb') as f:
+            descriptor = f.read(3)
+    except OSError:
+        return None
+    # The descriptor opens with a Usage Page item: 0x05 (1 byte) or 0x06 (2 bytes)
+    if len(descriptor) >= 2 and descriptor[0] == 0x05:
+        return descriptor[1]
+    if len(descriptor) >= 3 and descriptor[0] == 0x06:
+        return descriptor[1] | (descriptor[2] << 8)
+    return None
+
+
+class HidapiTransport:
+    """The physical panel, opened through hidapi
+
+    The path of the last interface opened is remembered in cache_path
+    (keyed by VID, PID and serial number) and tried first on the next open,
+    so reconnecting skips enumeration. An entry is only trusted when the
+    opened device reports the same product and serial as when it was
+    cached (and, for Linux hidraw paths, the same top-level usage page);
+    otherwise it is dropped and every interface is enumerated.
+
+    quiet skips the per-interface diagnostics printed while enumerating.
+    """
+
+    def __init__(self, vid: int = 0x04D9, pid: int = 0xFD01, serial: str = None,
+                 cache_path: str = DEFAULT_PATH_CACHE, quiet: bool = False):
+        self.vid = vid
+        self.pid = pid
+        self.serial = serial or None
+        self.cache_path = cache_path
+        self.quiet = quiet
+        self.device = None
+        self.path = None  # Path of the open interface
+
+    def _log(self, message: str = ""):
+        """Print an enumeration diagnostic unless quiet"""
+        if not self.quiet:
+            print(message)
+
+    def _cache_key(self) -> str:
+        return f"{self.vid:04x}:{self.pid:04x}:{self.serial or ''}"
+
+    def _load_cache(self) -> dict:
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _store_cache(self, entry):
+        """Save (or with None, forget) this device's cache entry; failures are ignored"""
+        if not self.cache_path:
+            return
+        cache = self._load_cache()
+        key = self._cache_key()
+        if entry is None:
+            if key not in cache:
+                return
+            del cache[key]
+        elif cache.get(key) == entry:
+            return
+        else:
+            cache[key] = entry
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(cache, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+
+    def _open_cached(self) -> bool:
+        """Open the cached interface path, if it still leads to the same device"""
+        entry = self._load_cache().get(self._cache_key())
+        if not isinstance(entry, dict) or not entry.get('path'):
+            return False
+
+        path = os.fsencode(entry['path'])
+        device = hid.device()
+        try:
+            device.open_path(path)
+            same = (device.get_product_string() == entry.get('product') and
+                    device.get_serial_number_string() == entry.get('serial'))
+        except Exception:
+            same = False
+        if same and entry.get('usage_page') is not None:
+            # Product and serial are the same for every interface of the
+            # panel; the usage page tells them apart after a renumbering
+            usage_page = _hidraw_usage_page(path)
+            same = usage_page is None or usage_page == entry['usage_page']
+        if not same:
+            device.close()
+            self._store_cache(None)
+            return False
+
+        self.device = device
+        self.path = path
+        self._log(f"Connected to S1 Display: {entry.get('product')} ({entry['path']}, cached)")
+        return True
+
+    def open(self) -> bool:
+        """Open the panel's vendor-defined HID interface"""
+        if hid is None:
+            print("hidapi is not installed (pip install hidapi)")
+            return False
+
+        if self._open_cached():
+            return True
+
+        try:
+            # Enumerate all matching devices
+            devices = hid.enumerate(self.vid, self.pid)
+            if self.serial:
+                devices = [dev for dev in devices if dev['serial_number'] == self.serial]
+
+            if not devices:
+                serial = f", serial {self.serial}" if self.serial else ""
+                print(f"No devices found with VID={hex(self.vid)}, PID={hex(self.pid)}{serial}")
+                self._log("\nTroubleshooting:")
+                self._log("1. Check if device is connected: lsusb | grep 04d9:fd01")
+                self._log("2. You may need to run with sudo")
+                self._log("3. Or install udev rules (see 99-s1-display.rules)")
+                return False
+
+            self._log(f"Found {len(devices)} device interface(s)")
+
+            # Try each interface
+            for idx, dev in enumerate(devices):
+                self._log(f"\nInterface {idx}:")
+                self._log(f"  Path: {dev['path']}")
+                self._log(f"  Manufacturer: {dev['manufacturer_string']}")
+                self._log(f"  Product: {dev['product_string']}")
+                self._log(f"  Usage Page: {hex(dev['usage_page'])}")
+                self._log(f"  Usage: {hex(dev['usage'])}")
+                self._log(f"  Interface: {dev['interface_number']}")
+
+                # Skip consumer control interface (usage_page 0x0C)
+                # We want the vendor-defined interface
+                if dev['usage_page'] == 0x0C:
+                    self._log("  -> Skipping (consumer control interface)")
+                    continue
+
+                # Try to open this interface
+                try:
+                    self._log("  -> Attempting to open...")
+                    self.device = hid.device()
+                    self.device.open_path(dev['path'])
+                    self.path = dev['path']
+                    self._log(f"  -> Successfully opened!")
+                    print(f"\nConnected to S1 Display: {dev['product_string']}")
+                    # Remember what the device reports about itself, for
+                    # checking the path still leads to it next time
+                    self._store_cache({
+                        'path': os.fsdecode(dev['path']),
+                        'product': self.device.get_product_string(),
+                        'serial': self.device.get_serial_number_string(),
+                        'usage_page': dev['usage_page'],
+                    })
+                    return True
+                except Exception as open_error:
+                    self._log(f"  -> Failed to open: {open_error}")
+                    self.device = None
+                    continue
+
+            print("\nFailed to open any suitable interface")
+            self._log("\nIf you see 'Permission denied' errors:")
+            self._log("1. Run with sudo: sudo python3 test_display.py")
+            self._log("2. Or install udev rules: sudo cp 99-s1-display.rules /etc/udev/rules.d/")
+            return False
+
+        except Exception as e:
+            print(f"Error during device enumeration: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+    def write(self, report) -> int:
+        return self.device.write(report)
+
+    def close(self):
+        if self.device:
+            self.device.close()
+            self.device = None
+            self.path = None
+
+
+class HidrawTransport(HidapiTransport):
+    """The physical panel, written through its Linux hidraw node directly
+
+    The interface is found as by HidapiTransport (cached path first, then
+    enumeration), then the /dev/hidrawN node is opened as a plain file
+    descriptor. write() is a single os.write() per report, and
+    write_many() sends a whole frame's reports with one os.writev(): hidraw
+    treats each buffer of the vector as a separate report, so a frame
+    costs one system call instead of one per packet.
+
+    path opens that node directly, skipping discovery. When hidapi is not
+    using hidraw (e.g. its libusb backend), writes go through hidapi.
+    batch=False makes S1Display write report by report, for comparison.
+    """
+
+    def __init__(self, vid: int = 0x04D9, pid: int = 0xFD01, serial: str = None,
+                 cache_path: str = DEFAULT_PATH_CACHE, quiet: bool = False, path: str = None,
+                 batch: bool = True):
+        super().__init__(vid, pid, serial, cache_path, quiet)
+        self.device_path = path
+        self.batch_writes = batch
+        self.fd = None
+        try:
+            self.iov_max = os.sysconf('SC_IOV_MAX')
+        except (AttributeError, ValueError, OSError):
+            self.iov_max = 1024
+
+    def open(self) -> bool:
+        """Find the panel's interface and open its hidraw node"""
+        if self.device_path:
+            return self._open_fd(self.device_path)
+        if not super().open():
+            return False
+
+        path = os.fsdecode(self.path)
+        if not path.startswith('/dev/hidraw'):
+            print(f"hidapi is not using hidraw ({path}), writing through hidapi")
+            return True
+        super().close()
+        return self._open_fd(path)
+
+    def _open_fd(self, path: str) -> bool:
+        try:
+            self.fd = os.open(path, os.O_RDWR | os.O_CLOEXEC)
+        except OSError as e:
+            print(f"Cannot open {path}: {e}")
+            return False
+        self.path = os.fsencode(path)
+        return True
+
+    def write(self, report) -> int:
+        if self.fd is None:
+            return super().write(report)
+        return os.write(self.fd, report)
+
+    def write_many(self, reports) -> int:
+        """Write several reports, one writev() per IOV_MAX of them
+
+        Returns how many reports were written whole; raises OSError if the
+        first one fails.
+        """
+        if self.fd is None:
+            for count, report in enumerate(reports):
+                if super().write(report) < 0:
+                    return count
+            return len(reports)
+
+        sent = 0
+        for first in range(0, len(reports), self.iov_max):
+            batch = reports[first:first + self.iov_max]
+            written = os.writev(self.fd, batch)
+            # A short write stops at the report that failed
+            for report in batch:
+                if written < len(report):
+                    return sent
+                written -= len(report)
+                sent += 1
+        return sent
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+            self.path = None
+        super().close()
+
+
+class NullTransport:
+    """Discards every packet, counting them (for headless rendering and benchmarks)"""
+
+    def __init__(self):
+        self.packets = 0
+        self.bytes_written = 0
+
+    def open(self) -> bool:
+        return True
+
+    def write(self, report) -> int:
+        self.packets += 1
+        self.bytes_written += len(report)
+        return len(report)
+
+    def close(self):
+        pass
+
+
+class RecordingTransport:
+    """Appends every packet to a file for later replay or inspection
+
+    Each record is a little-endian header of the send time (float64 epoch
+    seconds) and report length (uint32), followed by the report bytes.
+    """
+
+    RECORD_HEADER = struct.Struct('<dI')
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def open(self) -> bool:
+        try:
+            self._file = open(self.path, 'ab')
+            return True
+        except OSError as e:
+            print(f"Cannot open packet recording {self.path}: {e}")
+            return False
+
+    def write(self, report) -> int:
+        self._file.write(self.RECORD_HEADER.pack(time.time(), len(report)))
+        self._file.write(report)
+        return len(report)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    @classmethod
+    def read_records(cls, path: str):
+        """Yield (timestamp, report) for every packet in a recording"""
+        with open(path, 'rb') as f:
+            while True:
+                header = f.read(cls.RECORD_HEADER.size)
+                if len(header) < cls.RECORD_HEADER.size:
+                    return
+                timestamp, length = cls.RECORD_HEADER.unpack(header)
+                yield timestamp, f.read(length)
+
+
+class LoopbackTransport:
+    """Emulates the panel: decodes packets back into an image
+
+    framebuffer holds what the panel would show, in S1Display's framebuffer
+    format, so it can be compared byte for byte with the frame that was sent.
+    """
+
+    def __init__(self, width: int = 320, height: int = 170, bytes_per_pixel: int = 2):
+        self.width = width
+        self.height = height
+        self.bytes_per_pixel = bytes_per_pixel
+        self.framebuffer = bytearray(width * height * bytes_per_pixel)
+        self.orientation = None
+        self.last_heartbeat = None  # (year, month, day, hour, minute)
+        self.packets = 0
+        self.frames = 0  # Full redraw sequences completed
+        self.partial_updates = 0
+        self.errors = 0  # Malformed or out-of-sequence packets
+        self._redraw_offset = None  # Byte offset of the next redraw chunk
+
+    def open(self) -> bool:
+        return True
+
+    def write(self, report) -> int:
+        self.packets += 1
+        packet = memoryview(report)[REPORT_ID_SIZE:]
+        if len(packet) < HEADER_SIZE or packet[0] != SIGNATURE:
+            self.errors += 1
+            return len(report)
+
+        cmd = (packet[1], packet[2])
+        data = packet[HEADER_SIZE:]
+        if cmd == CMD_FULL_REDRAW_START:
+            self._redraw_offset = 0
+            self._redraw_chunk(data)
+        elif cmd in (CMD_FULL_REDRAW_CONTINUE, CMD_FULL_REDRAW_END):
+            if self._redraw_offset is None:
+                self.errors += 1
+            else:
+                self._redraw_chunk(data)
+                if cmd == CMD_FULL_REDRAW_END:
+                    self._redraw_offset = None
+                    self.frames += 1
+        elif cmd == CMD_PARTIAL_UPDATE:
+            self._partial(packet[3] | (packet[4] << 8), packet[5], packet[6], packet[7], data)
+        elif cmd == CMD_SET_ORIENTATION:
+            self.orientation = packet[3]
+        elif cmd == CMD_HEARTBEAT:
+            self.last_heartbeat = tuple(packet[3:8])
+        else:
+            self.errors += 1
+        return len(report)
+
+    def _redraw_chunk(self, data):
+        """Copy the next full redraw chunk into place"""
+        offset = self._redraw_offset
+        end = min(offset + DATA_SIZE, len(self.framebuffer))
+        self.framebuffer[offset:end] = data[:end - offset]
+        self._redraw_offset = offset + DATA_SIZE
+
+    def _partial(self, x, y, width, height, data):
+        """Copy a partial update's rows into place"""
+        if x + width > self.width or y + height > self.height or \
+                width * height * self.bytes_per_pixel > len(data):
+            self.errors += 1
+            return
+        row_bytes = width * self.bytes_per_pixel
+        for row in range(height):
+            start = ((y + row) * self.width + x) * self.bytes_per_pixel
+            self.framebuffer[start:start + row_bytes] = data[row * row_bytes:(row + 1) * row_bytes]
+        self.partial_updates += 1
+
+    def close(self):
+        pass
+
+
+TRANSPORTS = {
+    'hidapi': HidapiTransport,
+    'hidraw': HidrawTransport,
+    'null': NullTransport,
+    'record': RecordingTransport,
+    'loopback': LoopbackTransport,
+}
+
+
+def create_transport(name: str = 'hidapi', **options):
+    """Create a transport by name ('hidapi', 'hidraw', 'null', 'record' or 'loopback')
+
+    options are passed to the transport, e.g. path for 'record'.
+    """
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown transport: {name}")
+    return TRANSPORTS[name](**options)
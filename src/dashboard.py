@@ -4,10 +4,15 @@ Advanced Dashboard for AceMagic S1 Display
 Shows customizable widgets with system info, network, monitoring, etc.
 """
 
+import json
 import time
 import yaml
 import sys
 import os
+import queue
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 
 # Add parent directory to path for imports
@@ -15,23 +20,55 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 from core.s1_display import S1Display
 from core.fonts import FontRenderer
+from core.config_watcher import ConfigWatcher
+from core.hotplug import DeviceSupervisor
+from core.control_socket import ControlServer, DEFAULT_SOCKET_PATH
+from core.transports import DEFAULT_PATH_CACHE, create_transport
+from core.metrics import Metrics
 from widgets.widgets import (
     TimeWidget, DateWidget, HostnameWidget,
     LocalIPWidget, TailscaleIPWidget, PublicIPWidget,
     CPUUsageWidget, MemoryUsageWidget, DiskUsageWidget,
-    TemperatureWidget, ServerMonitorWidget, CustomTextWidget
+    TemperatureWidget, ServerMonitorWidget, CustomTextWidget,
+    WidgetSampler, ServerHealthChecker
 )
 
 
+# Fixed screen area owned by one widget
+WidgetBox = namedtuple('WidgetBox', ['x', 'y', 'width', 'height'])
+
+# Pixels pushed over the control socket, drawn on top of the widgets
+Overlay = namedtuple('Overlay', ['x', 'y', 'width', 'height', 'pixels', 'expires'])
+
+
 class Dashboard:
     """Main dashboard manager"""
 
-    def __init__(self, config_file='config.yaml'):
-        self.config = self.load_config(config_file)
+    # Heartbeats keep the panel's internal clock running
+    HEARTBEAT_INTERVAL = 1.0
+
+    def __init__(self, config_file='config.yaml', config=None):
+        self.config_file = config_file
+        self.config = config if config is not None else self.load_config(config_file)
+        self.config_watcher = None
         self.display = None
+        self.supervisor = None  # Reconnects the display after USB resets
         self.font = None
         self.widgets = []
+        self._previous_widgets = {}
+        self.sampler = None
+        self.health_checker = None
+        self.layout = []  # (name, widget, WidgetBox) in draw order
         self.layout_y = 5  # Current Y position for auto layout
+        self._last_outputs = None  # Widget outputs drawn by the previous render()
+        self.control = None
+        self._calls = queue.Queue()  # Control requests waiting for the render loop
+        self.overlay = None
+        self._overlay_drawn = False
+        self.frame_seq = 0  # Incremented for every frame sent to the display
+        self.last_frame = None  # Copy of the framebuffer as last sent
+        self._frame_cond = threading.Condition()
+        self.metrics = self.create_metrics()
 
     def load_config(self, config_file):
         """Load configuration from YAML file"""
@@ -65,169 +102,565 @@ class Dashboard:
         print("Setting up dashboard...")
 
         # Connect to display
-        self.display = S1Display()
+        self.display = S1Display(transport=self.create_display_transport(),
+                                 metrics=self.metrics, **self.display_options())
         if not self.display.connect():
-            print("Failed to connect to display")
-            return False
+            if not self.hotplug_recovery():
+                print("Failed to connect to display")
+                return False
+            # Keep running; the supervisor connects when the panel appears
+            print("Display not found, waiting for it to be connected")
 
         # Set orientation
+        self.apply_orientation()
+        time.sleep(0.1)
+        self.update_supervisor()
+
+        # Overlap USB transmission with rendering of the next frame
+        if self.config.get('display', {}).get('async_transmit', False):
+            self.display.start_async()
+
+        # Initialize font renderer
+        self.font = FontRenderer(self.display)
+
+        # Create widgets and place them
+        self.create_widgets()
+        self.compute_layout()
+
+        # Collect widget values in the background so slow checks never stall rendering
+        self.health_checker.start()
+        self.sampler = WidgetSampler(self.widgets, metrics=self.metrics)
+        # New server check results wake the render loop like sampled values
+        self.health_checker.on_result = self.sampler.changed.set
+        self.sampler.start()
+
+        # Pick up config edits without restarting the service
+        self.config_watcher = ConfigWatcher(self.config_file)
+
+        # Control socket for the web GUI (optional; failures are not fatal)
+        socket_path = self.config.get('control', {}).get('socket_path', DEFAULT_SOCKET_PATH)
+        if socket_path:
+            self.control = ControlServer(self, socket_path)
+            if not self.control.start():
+                self.control = None
+
+        print(f"Dashboard initialized with {len(self.widgets)} widgets")
+        return True
+
+    def display_options(self):
+        """S1Display transmit options from the display config section"""
+        display_cfg = self.config.get('display', {})
+        return {
+            'partial_updates': display_cfg.get('partial_updates', False),
+            'shadow_frame': display_cfg.get('shadow_frame', False),
+            'pacing': display_cfg.get('pacing', S1Display.PACING_FIXED),
+            'packet_delay': display_cfg.get('packet_delay', 0.01),
+        }
+
+    @staticmethod
+    def create_metrics():
+        """Metrics registry with descriptions of everything the dashboard records"""
+        metrics = Metrics()
+        metrics.describe('frame_stage_seconds',
+                         'Time per frame in each stage (collect, layout, rasterize, '
+                         'transmit = packet_build + hid_write + sleep)')
+        metrics.describe('widget_sample_seconds', 'Time taken by each widget to produce its value')
+        metrics.describe('frames_rendered_total', 'Frames drawn because a widget changed')
+        metrics.describe('frames_unchanged_total', 'Render passes skipped because nothing changed')
+        metrics.describe('frames_sent_total', 'Frames handed to the transport')
+        metrics.describe('frames_dropped_total', 'Queued frames replaced by a newer one before sending')
+        metrics.describe('packets_sent_total', 'HID packets written')
+        metrics.describe('packets_skipped_total', 'Full redraw packets avoided by partial or shadow updates')
+        metrics.describe('hid_write_errors_total', 'Failed HID writes')
+        metrics.describe('display_disconnects_total', 'Times the display stopped responding or was unplugged')
+        metrics.describe('display_reconnects_total', 'Times the display was reopened and its last frame restored')
+        return metrics
+
+    def create_display_transport(self):
+        """Packet transport from the display config (the real panel by default)"""
+        display_cfg = self.config.get('display', {})
+        name = display_cfg.get('transport', 'hidapi')
+        if name is None:
+            # An unquoted "transport: null" loads as YAML null
+            name = 'null'
+        if name == 'record':
+            return create_transport(name, path=display_cfg.get('record_path', 's1-packets.rec'))
+        if name in ('hidapi', 'hidraw'):
+            return create_transport(name, serial=display_cfg.get('device_serial'),
+                                    cache_path=display_cfg.get('device_cache', DEFAULT_PATH_CACHE),
+                                    quiet=display_cfg.get('quiet_connect', False))
+        return create_transport(name)
+
+    def hotplug_recovery(self) -> bool:
+        """Whether a lost display is reconnected automatically"""
+        return self.config.get('display', {}).get('hotplug_recovery', True)
+
+    def update_supervisor(self):
+        """Start or stop the reconnect supervisor to match the config"""
+        if self.hotplug_recovery():
+            if not self.supervisor:
+                self.supervisor = DeviceSupervisor(self.display)
+                self.supervisor.start()
+        elif self.supervisor:
+            self.supervisor.stop()
+            self.supervisor = None
+
+    def apply_orientation(self):
+        """Send the configured orientation to the display"""
         orientation = self.config.get('display', {}).get('orientation', 'landscape')
         if orientation == 'landscape':
             self.display.set_orientation(S1Display.ORIENTATION_LANDSCAPE)
         else:
             self.display.set_orientation(S1Display.ORIENTATION_PORTRAIT)
 
-        time.sleep(0.1)
+    def reload_config(self):
+        """Apply config file changes to the running dashboard
 
-        # Initialize font renderer
-        self.font = FontRenderer(self.display)
+        Returns True if a new config was applied.
+        """
+        try:
+            with open(self.config_file, 'r') as f:
+                config = yaml.safe_load(f)
+        except Exception as e:
+            # Keep running with the current config (the file may be mid-write)
+            print(f"Error reloading config: {e}")
+            return False
+        if not isinstance(config, dict):
+            print("Ignoring empty or invalid config")
+            return False
+        try:
+            return self.apply_config(config)
+        except ValueError:
+            # Already reported; keep running with the current config
+            return False
 
-        # Create widgets
-        self.create_widgets()
+    def restore_health_targets(self):
+        """Register the current server widgets' hosts again (after a failed create_widgets())"""
+        if self.health_checker is None:
+            return
+        self.health_checker.clear_targets()
+        for _, widget in self.widgets:
+            if isinstance(widget, ServerMonitorWidget) and widget.host:
+                self.health_checker.register(widget.host, widget.port, widget.update_interval)
+
+    def apply_config(self, config):
+        """Switch the running dashboard to a new config
+
+        The display connection, font caches and unchanged widgets (with
+        their cached values and sampling schedule) are kept. Returns True
+        if anything changed. Widgets and layout are built before anything
+        else changes; if that fails (e.g. a section that is not a mapping)
+        the previous config, widgets and layout are restored and ValueError
+        is raised.
+        """
+        if config == self.config:
+            return False
 
-        print(f"Dashboard initialized with {len(self.widgets)} widgets")
+        previous = (self.config, self.widgets, self.layout, self.layout_y)
+        self.config = config
+        try:
+            display_cfg = config.get('display', {})
+            options = self.display_options()
+            self.create_widgets()
+            self.compute_layout()
+        except Exception as e:
+            self.config, self.widgets, self.layout, self.layout_y = previous
+            self._last_outputs = None
+            self.restore_health_targets()
+            print(f"Config not applied: {e!r}")
+            raise ValueError(f"Invalid config: {e!r}") from e
+        old_display_cfg = previous[0].get('display', {})
+
+        # Transmit options apply in place
+        if options['pacing'] not in (S1Display.PACING_FIXED, S1Display.PACING_NONE,
+                                     S1Display.PACING_ADAPTIVE):
+            print(f"Unknown pacing mode {options['pacing']}, keeping {self.display.pacing}")
+            del options['pacing']
+        for option, value in options.items():
+            setattr(self.display, option, value)
+
+        if display_cfg.get('orientation') != old_display_cfg.get('orientation'):
+            self.apply_orientation()
+        if display_cfg.get('async_transmit', False):
+            self.display.start_async()
+        else:
+            self.display.stop_async()
+        self.update_supervisor()
+
+        self.sampler.set_widgets(self.widgets)
+
+        print(f"Config applied: {len(self.widgets)} widgets")
         return True
 
+    def call_in_loop(self, func, *args, timeout=None):
+        """Run func(*args) on the render loop thread and return its result
+
+        Used by the control socket so requests never race with render().
+        Raises TimeoutError if the loop does not get to it within timeout.
+        """
+        done = threading.Event()
+        result = {}
+        self._calls.put((func, args, done, result))
+        if self.sampler:
+            # Wake the render loop
+            self.sampler.changed.set()
+        if not done.wait(timeout):
+            raise TimeoutError("Dashboard did not respond")
+        if 'error' in result:
+            raise result['error']
+        return result['value']
+
+    def run_calls(self):
+        """Run queued control requests; returns True if any ran"""
+        ran = False
+        while True:
+            try:
+                func, args, done, result = self._calls.get_nowait()
+            except queue.Empty:
+                return ran
+            try:
+                result['value'] = func(*args)
+            except Exception as e:
+                result['error'] = e
+            done.set()
+            ran = True
+
+    def widget_values(self):
+        """Current output of every widget, in draw order"""
+        values = []
+        for name, widget, _ in self.layout:
+            text, color, _, percent = self.widget_output(name, widget)
+            values.append({'name': name, 'text': text, 'color': list(color),
+                           'percent': percent})
+        return values
+
+    def set_overlay(self, x, y, width, height, pixels, duration):
+        """Draw framebuffer-format pixels over the widgets for duration seconds
+
+        A duration of 0 keeps the overlay until clear_overlay().
+        """
+        expires = time.time() + duration if duration > 0 else float('inf')
+        if self.overlay:
+            # The old overlay may cover a different area
+            self._last_outputs = None
+        self.overlay = Overlay(x, y, width, height, bytes(pixels), expires)
+        self._overlay_drawn = False
+
+    def clear_overlay(self):
+        """Remove the overlay; the next render repaints the widgets"""
+        if self.overlay:
+            self.overlay = None
+            self._last_outputs = None
+
     def create_widgets(self):
-        """Create enabled widgets from config"""
+        """Create enabled widgets from config
+
+        Widgets whose name, type and config are unchanged from the previous
+        call are reused, keeping their cached values.
+        """
+        self._previous_widgets = dict(self.widgets)
         self.widgets = []
 
         # Time widget
         if self.config.get('time', {}).get('enabled', False):
-            self.widgets.append(('time', TimeWidget(self.config['time'], self.font)))
+            self.add_widget('time', TimeWidget, self.config['time'])
 
         # Date widget
         if self.config.get('date', {}).get('enabled', False):
-            self.widgets.append(('date', DateWidget(self.config['date'], self.font)))
+            self.add_widget('date', DateWidget, self.config['date'])
 
         # Hostname
         if self.config.get('hostname', {}).get('enabled', False):
-            self.widgets.append(('hostname', HostnameWidget(self.config['hostname'], self.font)))
+            self.add_widget('hostname', HostnameWidget, self.config['hostname'])
 
         # Network widgets
         network_cfg = self.config.get('network', {})
 
         if network_cfg.get('local_ip', {}).get('enabled', False):
-            self.widgets.append(('local_ip', LocalIPWidget(network_cfg['local_ip'], self.font)))
+            self.add_widget('local_ip', LocalIPWidget, network_cfg['local_ip'])
 
         if network_cfg.get('tailscale_ip', {}).get('enabled', False):
-            self.widgets.append(('tailscale_ip', TailscaleIPWidget(network_cfg['tailscale_ip'], self.font)))
+            self.add_widget('tailscale_ip', TailscaleIPWidget, network_cfg['tailscale_ip'])
 
         if network_cfg.get('public_ip', {}).get('enabled', False):
-            self.widgets.append(('public_ip', PublicIPWidget(network_cfg['public_ip'], self.font)))
+            self.add_widget('public_ip', PublicIPWidget, network_cfg['public_ip'])
 
         # System monitoring
         system_cfg = self.config.get('system', {})
 
         if system_cfg.get('cpu_usage', {}).get('enabled', False):
-            self.widgets.append(('cpu', CPUUsageWidget(system_cfg['cpu_usage'], self.font)))
+            self.add_widget('cpu', CPUUsageWidget, system_cfg['cpu_usage'])
 
         if system_cfg.get('memory_usage', {}).get('enabled', False):
-            self.widgets.append(('memory', MemoryUsageWidget(system_cfg['memory_usage'], self.font)))
+            self.add_widget('memory', MemoryUsageWidget, system_cfg['memory_usage'])
 
         if system_cfg.get('disk_usage', {}).get('enabled', False):
-            self.widgets.append(('disk', DiskUsageWidget(system_cfg['disk_usage'], self.font)))
+            self.add_widget('disk', DiskUsageWidget, system_cfg['disk_usage'])
 
         if system_cfg.get('temperature', {}).get('enabled', False):
-            self.widgets.append(('temp', TemperatureWidget(system_cfg['temperature'], self.font)))
+            self.add_widget('temp', TemperatureWidget, system_cfg['temperature'])
 
-        # Server monitoring
+        # Server monitoring (all hosts probed concurrently by one checker)
         servers = self.config.get('servers', [])
+        if self.health_checker is None:
+            self.health_checker = ServerHealthChecker()
+        self.health_checker.clear_targets()
         for server_cfg in servers:
             if server_cfg.get('enabled', False):
                 name = server_cfg.get('name', 'Server')
-                self.widgets.append((f'server_{name}', ServerMonitorWidget(server_cfg, self.font)))
+                widget = self.add_widget(f'server_{name}', ServerMonitorWidget, server_cfg,
+                                         self.health_checker)
+                # Reused widgets registered before clear_targets()
+                if widget.host:
+                    self.health_checker.register(widget.host, widget.port, widget.update_interval)
 
         # Custom text
         custom_texts = self.config.get('custom_text', [])
         for idx, text_cfg in enumerate(custom_texts):
             if text_cfg.get('enabled', False):
-                self.widgets.append((f'custom_{idx}', CustomTextWidget(text_cfg, self.font)))
-
-    def render(self):
-        """Render all widgets to display"""
-        # Clear display
-        bg_color = self.config.get('display', {}).get('background_color', [0, 0, 0])
-        self.display.clear(*bg_color)
-
-        # Reset layout position
-        self.layout_y = 5
+                self.add_widget(f'custom_{idx}', CustomTextWidget, text_cfg)
+
+    def add_widget(self, name, widget_class, config, *args):
+        """Append a widget, reusing the existing one if its config is unchanged"""
+        widget = self._previous_widgets.get(name)
+        if type(widget) is not widget_class or widget.config != config:
+            widget = widget_class(config, self.font, *args)
+        self.widgets.append((name, widget))
+        return widget
+
+    def compute_layout(self):
+        """Assign every widget a fixed box from the config
+
+        Called once at setup (and again whenever widgets are recreated), so
+        render() never recomputes positions and each widget can erase and
+        repaint just its own box. Each box is a full-width row band tall
+        enough for the widget's text and progress bar.
+        """
+        start = time.perf_counter()
         line_spacing = self.config.get('layout', {}).get('line_spacing', 2)
-        padding = self.config.get('layout', {}).get('padding', 5)
+        self.layout_y = 5
 
-        # Render each widget
+        self.layout = []
         for name, widget in self.widgets:
-            text = widget.get_display_text()
-            if not text:
-                continue
-
-            color = widget.get_color()
-
-            # Get font scale from widget config
             font_scale = widget.get_font_scale()
 
-            # Handle special rendering for certain widgets
             if name == 'time':
                 # Large time at top center (use configured scale or default to 6)
                 time_scale = font_scale if font_scale > 2 else 6
-                self.font.draw_text_centered_5x7(self.layout_y, text, *color, scale=time_scale)
-                self.layout_y += (7 * time_scale) + line_spacing + 3
+                height = 7 * time_scale
+                gap = line_spacing + 3
             elif name == 'date':
                 # Centered date (use configured scale or default to 2)
                 date_scale = font_scale if font_scale <= 3 else 2
-                self.font.draw_text_centered_3x5(self.layout_y, text, *color, scale=date_scale)
-                self.layout_y += (5 * date_scale) + line_spacing + 3
-            elif name in ['cpu', 'memory']:
+                height = 5 * date_scale
+                gap = line_spacing + 3
+            else:
+                height = 5 * font_scale
+                gap = line_spacing
+                if self.has_progress_bar(name, widget):
+                    # Progress bar may be taller than the text
+                    height = max(height, 8, font_scale * 4)
+
+            box = WidgetBox(0, self.layout_y, S1Display.WIDTH, height)
+            self.layout.append((name, widget, box))
+            self.layout_y += height + gap
+
+        # Positions changed, so the next render must repaint everything
+        self._last_outputs = None
+        self.metrics.observe('frame_stage_seconds', 'stage', 'layout', time.perf_counter() - start)
+
+    @staticmethod
+    def has_progress_bar(name, widget):
+        """Whether a widget draws a progress bar next to its text"""
+        return name in ['cpu', 'memory'] and hasattr(widget, 'get_usage_percent') and widget.show_bar
+
+    def widget_output(self, name, widget):
+        """Everything that determines how a widget looks: (text, color, scale, bar percent)"""
+        text = widget.get_display_text()
+        percent = None
+        if self.has_progress_bar(name, widget):
+            percent = widget.get_usage_percent()
+        return (text, widget.get_color(), widget.get_font_scale(), percent)
+
+    def draw_widget(self, name, output, box):
+        """Draw one widget's output into its box"""
+        text, color, font_scale, percent = output
+        if not text:
+            return
+        padding = self.config.get('layout', {}).get('padding', 5)
+
+        # Handle special rendering for certain widgets
+        if name == 'time':
+            time_scale = font_scale if font_scale > 2 else 6
+            self.font.draw_text_centered_5x7(box.y, text, *color, scale=time_scale)
+        elif name == 'date':
+            date_scale = font_scale if font_scale <= 3 else 2
+            self.font.draw_text_centered_3x5(box.y, text, *color, scale=date_scale)
+        else:
+            # Regular text with configurable scale
+            self.font.draw_text_3x5(padding, box.y, text, *color, scale=font_scale)
+
+            if percent is not None:
                 # System widgets with progress bars
-                self.font.draw_text_3x5(padding, self.layout_y, text, *color, scale=font_scale)
-
-                if hasattr(widget, 'get_usage_percent') and widget.show_bar:
-                    # Draw progress bar
-                    bar_x = padding + (40 * font_scale)
-                    bar_y = self.layout_y
-                    bar_width = 60
-                    bar_height = max(8, font_scale * 4)
-                    percent = widget.get_usage_percent()
-                    self.font.draw_progress_bar(bar_x, bar_y, bar_width, bar_height,
-                                                percent, color)
-
-                self.layout_y += (5 * font_scale) + line_spacing
+                bar_x = padding + (40 * font_scale)
+                bar_width = 60
+                bar_height = max(8, font_scale * 4)
+                self.font.draw_progress_bar(bar_x, box.y, bar_width, bar_height,
+                                            percent, color)
+
+    def render(self, force=False):
+        """Repaint the boxes of widgets whose output changed since the last frame
+
+        Unchanged frames are skipped entirely. The whole screen is only
+        cleared for the first frame after a layout change (or with force).
+        Returns True if a frame was sent to the display.
+        """
+        metrics = self.metrics
+        start = time.perf_counter()
+        bg_color = self.config.get('display', {}).get('background_color', [0, 0, 0])
+        outputs = []
+        for name, widget, _ in self.layout:
+            if widget.sample_inline:
+                # Inline widgets compute their value here; time them like sampled ones
+                last_update = widget.last_update
+                widget_start = time.perf_counter()
+                outputs.append(self.widget_output(name, widget))
+                if widget.last_update != last_update:
+                    metrics.observe('widget_sample_seconds', 'widget', name,
+                                    time.perf_counter() - widget_start)
             else:
-                # Regular text with configurable scale
-                self.font.draw_text_3x5(padding, self.layout_y, text, *color, scale=font_scale)
-                self.layout_y += (5 * font_scale) + line_spacing
+                outputs.append(self.widget_output(name, widget))
+        previous = self._last_outputs
+        raster_start = time.perf_counter()
+        metrics.observe('frame_stage_seconds', 'stage', 'collect', raster_start - start)
+
+        if self.overlay and time.time() >= self.overlay.expires:
+            self.clear_overlay()
+            previous = None
+
+        if force or previous is None:
+            self.display.clear(*bg_color)
+            for (name, _, box), output in zip(self.layout, outputs):
+                self.draw_widget(name, output, box)
+            changed = True
+        else:
+            changed = False
+            for (name, _, box), output, last in zip(self.layout, outputs, previous):
+                if output == last:
+                    continue
+                self.display.fill_rect(box.x, box.y, box.width, box.height, *bg_color)
+                self.draw_widget(name, output, box)
+                changed = True
+
+        # Keep the overlay on top of anything just repainted
+        overlay = self.overlay
+        if overlay and (changed or not self._overlay_drawn):
+            self.display.blit(overlay.x, overlay.y, overlay.width, overlay.height, overlay.pixels)
+            self._overlay_drawn = True
+            changed = True
+
+        if not changed:
+            metrics.count('frames_unchanged_total')
+            return False
+
+        self._last_outputs = outputs
+        metrics.observe('frame_stage_seconds', 'stage', 'rasterize', time.perf_counter() - raster_start)
+        metrics.count('frames_rendered_total')
 
         # Update display
         self.display.update_display()
+        self.publish_frame()
+        return True
+
+    def publish_frame(self):
+        """Record the frame just sent and wake anyone waiting in wait_for_frame()"""
+        frame = bytes(self.display.framebuffer)
+        with self._frame_cond:
+            self.last_frame = frame
+            self.frame_seq += 1
+            self._frame_cond.notify_all()
+
+    def wait_for_frame(self, since, timeout):
+        """Wait until a frame other than sequence number since has been sent
+
+        Safe to call from any thread. Returns (seq, frame), with frame None
+        if nothing new was sent within timeout.
+        """
+        with self._frame_cond:
+            self._frame_cond.wait_for(lambda: self.frame_seq != since and self.last_frame,
+                                      timeout)
+            if self.frame_seq == since or not self.last_frame:
+                return self.frame_seq, None
+            return self.frame_seq, self.last_frame
+
+    def next_change_time(self):
+        """Earliest time any widget's value (or the overlay) may change"""
+        next_time = min((widget.next_change_time() for _, widget in self.widgets),
+                        default=time.time() + 60)
+        if self.overlay:
+            next_time = min(next_time, self.overlay.expires)
+        return next_time
+
+    def wait_for_change(self, deadline):
+        """Sleep until deadline, waking early if the sampler publishes a new value
+
+        Returns True if woken by the sampler.
+        """
+        timeout = deadline - time.time()
+        if timeout <= 0:
+            return False
+        if self.sampler and self.sampler.changed.wait(timeout):
+            self.sampler.changed.clear()
+            return True
+        if not self.sampler:
+            time.sleep(timeout)
+        return False
 
     def run(self):
-        """Main dashboard loop"""
+        """Main dashboard loop
+
+        Sleeps until a widget's value can change (or the sampler reports a
+        new value) and renders at most once per update_interval.
+        """
         if not self.setup():
             return
 
-        update_interval = self.config.get('display', {}).get('update_interval', 1)
         last_render = 0
+        next_render = 0
+        next_heartbeat = 0
 
         print("Dashboard running (Ctrl+C to exit)...")
 
         try:
             while True:
-                # Send heartbeat
-                self.display.send_heartbeat()
-
-                # Render if enough time has passed
                 current_time = time.time()
-                if (current_time - last_render) >= update_interval:
-                    self.render()
-                    last_render = current_time
+                update_interval = self.config.get('display', {}).get('update_interval', 1)
+
+                # Apply config edits and control requests immediately
+                if self.config_watcher.changed() and self.reload_config():
+                    next_render = 0
+                if self.run_calls():
+                    next_render = 0
 
-                    # Debug output
-                    widget_summary = ', '.join([name for name, _ in self.widgets[:5]])
-                    if len(self.widgets) > 5:
-                        widget_summary += f', ... ({len(self.widgets)} total)'
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Updated - Widgets: {widget_summary}")
+                # Send heartbeat
+                if current_time >= next_heartbeat:
+                    self.display.send_heartbeat()
+                    next_heartbeat = current_time + self.HEARTBEAT_INTERVAL
+
+                # Render when a widget may have changed
+                if current_time >= next_render:
+                    if self.render():
+                        # Debug output
+                        widget_summary = ', '.join([name for name, _ in self.widgets[:5]])
+                        if len(self.widgets) > 5:
+                            widget_summary += f', ... ({len(self.widgets)} total)'
+                        frame_ms = self.display.last_frame_duration * 1000
+                        print(f"[{datetime.now().strftime('%H:%M:%S')}] Updated in {frame_ms:.0f}ms - Widgets: {widget_summary}")
+                    last_render = current_time
+                    next_render = max(self.next_change_time(), last_render + update_interval)
 
-                time.sleep(0.5)
+                if self.wait_for_change(min(next_render, next_heartbeat)):
+                    next_render = min(next_render, last_render + update_interval)
 
         except KeyboardInterrupt:
             print("\nStopping dashboard...")
@@ -235,6 +668,16 @@ class Dashboard:
 
     def cleanup(self):
         """Clean up and disconnect"""
+        if self.control:
+            self.control.stop()
+        if self.supervisor:
+            self.supervisor.stop()
+        if self.config_watcher:
+            self.config_watcher.close()
+        if self.sampler:
+            self.sampler.stop()
+        if self.health_checker:
+            self.health_checker.stop()
         if self.display:
             bg_color = self.config.get('display', {}).get('background_color', [0, 0, 0])
             self.display.clear(*bg_color)
@@ -243,6 +686,83 @@ class Dashboard:
         print("Dashboard stopped")
 
 
+# Values sampled for previews are reused while fresh, so that editing a config
+# in the web GUI does not rerun slow lookups (public IP, tailscale) per preview
+PREVIEW_SAMPLE_MAX_AGE = 30.0  # seconds
+PREVIEW_SAMPLE_CACHE_SIZE = 64
+
+# Widget config keys that only change how a value is drawn, not the value
+PREVIEW_DISPLAY_KEYS = ('enabled', 'position', 'font_scale', 'size', 'color',
+                        'prefix', 'show_bar')
+
+# Widget state set by get_value() along with the value (progress bars)
+PREVIEW_SAMPLE_STATE = ('usage_percent',)
+
+# One sample of a widget's value, run on the shared preview pool
+PreviewSample = namedtuple('PreviewSample', ['future', 'widget', 'started'])
+
+_preview_executor = None
+_preview_samples = OrderedDict()  # Sample key -> PreviewSample, least recently used first
+_preview_lock = threading.Lock()
+
+
+def _preview_sample(widget):
+    """Sample of the widget's value, shared with earlier previews of the same config"""
+    global _preview_executor
+    config = {k: v for k, v in widget.config.items() if k not in PREVIEW_DISPLAY_KEYS}
+    key = (type(widget).__name__, json.dumps(config, sort_keys=True, default=str))
+    now = time.monotonic()
+    with _preview_lock:
+        sample = _preview_samples.get(key)
+        if sample and (not sample.future.done() or now - sample.started < PREVIEW_SAMPLE_MAX_AGE):
+            _preview_samples.move_to_end(key)
+            return sample
+
+        if _preview_executor is None:
+            _preview_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='s1-preview')
+        sample = PreviewSample(_preview_executor.submit(widget.get_value), widget, now)
+        _preview_samples[key] = sample
+        _preview_samples.move_to_end(key)
+        while len(_preview_samples) > PREVIEW_SAMPLE_CACHE_SIZE:
+            _preview_samples.popitem(last=False)
+        return sample
+
+
+def render_preview(config, sample_timeout=1.0):
+    """Render a config off-device and return the framebuffer
+
+    Uses the same widgets, layout and fonts as the running dashboard, drawn
+    into an S1Display that is never connected. Background-sampled widgets
+    get sample_timeout seconds to produce a value and show the sampler's
+    placeholder otherwise; server widgets show their pending state. Samples
+    run on a shared pool and are reused for PREVIEW_SAMPLE_MAX_AGE seconds
+    by later previews whose widget has the same settings.
+    """
+    dashboard = Dashboard(config=config)
+    dashboard.display = S1Display(pacing=S1Display.PACING_NONE)
+    dashboard.font = FontRenderer(dashboard.display)
+    dashboard.create_widgets()
+    dashboard.compute_layout()
+
+    samples = {widget: _preview_sample(widget)
+               for _, widget in dashboard.widgets if not widget.sample_inline}
+    # A slow lookup keeps running for the next preview instead of holding this one
+    wait([sample.future for sample in samples.values()], timeout=sample_timeout)
+    for widget, sample in samples.items():
+        widget.sampled = True
+        future = sample.future
+        if future.done() and not future.exception():
+            widget.cached_value = future.result()
+            for attr in PREVIEW_SAMPLE_STATE:
+                if hasattr(sample.widget, attr):
+                    setattr(widget, attr, getattr(sample.widget, attr))
+        else:
+            widget.cached_value = WidgetSampler.PENDING_TEXT
+
+    dashboard.render(force=True)
+    return bytes(dashboard.display.framebuffer)
+
+
 def main():
     """Entry point"""
     config_file = 'config.yaml'
@@ -4,11 +4,16 @@ Widget system for S1 Display
 Modular information display components
 """
 
+import asyncio
 import socket
+import struct
 import subprocess
+import threading
 import time
 import psutil
 import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from abc import ABC, abstractmethod
 from typing import Optional, Tuple
@@ -17,24 +22,40 @@ from typing import Optional, Tuple
 class Widget(ABC):
     """Base class for display widgets"""
 
+    # Cheap widgets whose value is computed in the render loop even when a
+    # WidgetSampler is running
+    sample_inline = False
+
     def __init__(self, config: dict, font_renderer):
         self.config = config
         self.font = font_renderer
         self.last_update = 0
         self.cached_value = None
         self.update_interval = config.get('update_interval', 1)
+        self.sampled = False  # Set while a WidgetSampler owns updates
 
     @abstractmethod
     def get_value(self) -> str:
         """Get the current value to display"""
         pass
 
+    def next_change_time(self) -> float:
+        """Earliest time (epoch seconds) at which the value may change
+
+        Sampled widgets return infinity: the WidgetSampler signals changes.
+        """
+        if self.sampled:
+            return float('inf')
+        return self.last_update + self.update_interval
+
     def should_update(self) -> bool:
         """Check if widget should update"""
-        return (time.time() - self.last_update) >= self.update_interval
+        return time.time() >= self.next_change_time()
 
     def update(self):
         """Update cached value if needed"""
+        if self.sampled:
+            return
         if self.should_update():
             self.cached_value = self.get_value()
             self.last_update = time.time()
@@ -58,6 +79,14 @@ class Widget(ABC):
 class TimeWidget(Widget):
     """Display current time"""
 
+    sample_inline = True
+
+    def next_change_time(self) -> float:
+        """Next second or minute boundary, depending on show_seconds"""
+        if self.config.get('show_seconds', False):
+            return int(self.last_update) + 1
+        return (int(self.last_update) // 60 + 1) * 60
+
     def get_value(self) -> str:
         now = datetime.now()
         fmt = self.config.get('format', '24h')
@@ -84,6 +113,12 @@ class TimeWidget(Widget):
 class DateWidget(Widget):
     """Display current date"""
 
+    sample_inline = True
+
+    def next_change_time(self) -> float:
+        """Next minute boundary (formats may include time fields)"""
+        return (int(self.last_update) // 60 + 1) * 60
+
     def get_value(self) -> str:
         fmt = self.config.get('format', '%a %b %d')
         return datetime.now().strftime(fmt)
@@ -177,6 +212,83 @@ class PublicIPWidget(Widget):
             return "N/A"
 
 
+# One system-wide sample shared by all system widgets (None where a reading failed)
+MetricsSnapshot = namedtuple('MetricsSnapshot',
+                             ['timestamp', 'cpu_percent', 'memory', 'disk', 'temperatures', 'net_io'])
+
+
+class SystemMetrics:
+    """Shared psutil collector
+
+    Takes at most one snapshot per tick and hands the same sample to every
+    widget that asks, so a widget's text and progress bar always agree and
+    no widget ever sleeps. CPU usage comes from psutil's non-blocking mode,
+    i.e. utilisation since the previous snapshot. Disk usage is read on
+    demand per mount point (see disk_usage()), so only paths still in use
+    are ever read.
+    """
+
+    def __init__(self, tick: float = 1.0):
+        self.tick = tick
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._watch_temperatures = False
+
+        # The first non-blocking call only sets the baseline
+        psutil.cpu_percent(interval=None)
+
+    def watch_temperatures(self):
+        """Include sensor temperatures in future snapshots"""
+        self._watch_temperatures = True
+
+    def snapshot(self) -> MetricsSnapshot:
+        """Latest snapshot, refreshed if older than one tick"""
+        with self._lock:
+            now = time.monotonic()
+            if self._snapshot is None or now - self._snapshot.timestamp >= self.tick:
+                self._snapshot = self._collect(now)
+            return self._snapshot
+
+    def disk_usage(self, path: str):
+        """Usage of a mount point in the current snapshot (None if it cannot be read)
+
+        The first request for a path in each tick reads it and stores it in
+        the snapshot's disk dict; the next snapshot starts empty.
+        """
+        disk = self.snapshot().disk
+        with self._lock:
+            if path not in disk:
+                disk[path] = self._read(psutil.disk_usage, path)
+            return disk[path]
+
+    def _collect(self, timestamp: float) -> MetricsSnapshot:
+        """Read every watched metric once"""
+        temperatures = None
+        if self._watch_temperatures and hasattr(psutil, 'sensors_temperatures'):
+            temperatures = self._read(psutil.sensors_temperatures)
+
+        return MetricsSnapshot(
+            timestamp=timestamp,
+            cpu_percent=self._read(psutil.cpu_percent, None),
+            memory=self._read(psutil.virtual_memory),
+            disk={},  # Filled by disk_usage()
+            temperatures=temperatures,
+            net_io=self._read(psutil.net_io_counters),
+        )
+
+    @staticmethod
+    def _read(func, *args):
+        """Call a psutil function, returning None instead of raising"""
+        try:
+            return func(*args)
+        except Exception:
+            return None
+
+
+# Collector shared by all system widgets
+system_metrics = SystemMetrics()
+
+
 class CPUUsageWidget(Widget):
     """Display CPU usage"""
 
@@ -184,20 +296,19 @@ class CPUUsageWidget(Widget):
         super().__init__(config, font_renderer)
         self.update_interval = 2
         self.show_bar = config.get('show_bar', True)
+        self.metrics = system_metrics
+        self.usage_percent = 0.0
 
     def get_value(self) -> str:
-        try:
-            usage = psutil.cpu_percent(interval=0.1)
-            return f"{int(usage)}%"
-        except Exception:
+        usage = self.metrics.snapshot().cpu_percent
+        if usage is None:
             return "N/A"
+        self.usage_percent = usage
+        return f"{int(usage)}%"
 
     def get_usage_percent(self) -> float:
-        """Get usage as percentage for progress bar"""
-        try:
-            return psutil.cpu_percent(interval=0.1)
-        except Exception:
-            return 0.0
+        """Get usage as percentage for progress bar (same sample as the text)"""
+        return self.usage_percent
 
 
 class MemoryUsageWidget(Widget):
@@ -207,20 +318,19 @@ class MemoryUsageWidget(Widget):
         super().__init__(config, font_renderer)
         self.update_interval = 2
         self.show_bar = config.get('show_bar', True)
+        self.metrics = system_metrics
+        self.usage_percent = 0.0
 
     def get_value(self) -> str:
-        try:
-            mem = psutil.virtual_memory()
-            return f"{int(mem.percent)}%"
-        except Exception:
+        mem = self.metrics.snapshot().memory
+        if mem is None:
             return "N/A"
+        self.usage_percent = mem.percent
+        return f"{int(mem.percent)}%"
 
     def get_usage_percent(self) -> float:
-        """Get usage as percentage for progress bar"""
-        try:
-            return psutil.virtual_memory().percent
-        except Exception:
-            return 0.0
+        """Get usage as percentage for progress bar (same sample as the text)"""
+        return self.usage_percent
 
 
 class DiskUsageWidget(Widget):
@@ -230,13 +340,13 @@ class DiskUsageWidget(Widget):
         super().__init__(config, font_renderer)
         self.update_interval = 60
         self.path = config.get('path', '/')
+        self.metrics = system_metrics
 
     def get_value(self) -> str:
-        try:
-            usage = psutil.disk_usage(self.path)
-            return f"{int(usage.percent)}%"
-        except Exception:
+        usage = self.metrics.disk_usage(self.path)
+        if usage is None:
             return "N/A"
+        return f"{int(usage.percent)}%"
 
 
 class TemperatureWidget(Widget):
@@ -246,12 +356,15 @@ class TemperatureWidget(Widget):
         super().__init__(config, font_renderer)
         self.update_interval = 5
         self.source = config.get('source', 'auto')
+        self.metrics = system_metrics
+        if self.source == 'auto':
+            self.metrics.watch_temperatures()
 
     def get_value(self) -> str:
         try:
             if self.source == 'auto':
                 # Try psutil first
-                temps = psutil.sensors_temperatures()
+                temps = self.metrics.snapshot().temperatures
                 if temps:
                     # Get first available temperature
                     for name, entries in temps.items():
@@ -270,43 +383,275 @@ class TemperatureWidget(Widget):
             return "N/A"
 
 
+# Outcome of one reachability probe (latency in seconds, None when down)
+HealthResult = namedtuple('HealthResult', ['online', 'latency', 'error'])
+
+
+class ServerHealthChecker:
+    """Concurrent server reachability checks using asyncio
+
+    Every registered host is probed on its own interval from one event loop
+    thread, so a round costs as much as the slowest probe rather than the
+    sum of all timeouts. Hosts with a port get a non-blocking TCP connect;
+    others get an ICMP echo (unprivileged ping socket, then raw socket),
+    falling back to a UDP probe that treats "port unreachable" as alive.
+    """
+
+    # Port used by the UDP fallback probe (traceroute's base port)
+    UDP_PROBE_PORT = 33434
+
+    ICMP_ECHO_REQUEST = 8
+    ICMP_ECHO_REPLY = 0
+
+    def __init__(self, timeout: float = 2.0):
+        self.timeout = timeout
+        self.results = {}  # (host, port) -> HealthResult
+        self.on_result = None  # Called (from the checker thread) after each periodic probe
+        self._targets = {}  # (host, port) -> check interval in seconds
+        self._sequence = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, host: str, port: Optional[int], interval: float):
+        """Add a host to the periodic checks (the shortest interval wins)"""
+        key = (host, port)
+        self._targets[key] = min(interval, self._targets.get(key, interval))
+
+    def clear_targets(self):
+        """Stop checking all hosts (latest results are kept)"""
+        self._targets = {}
+
+    def get_result(self, host: str, port: Optional[int]) -> Optional[HealthResult]:
+        """Latest result for a host, or None if it has not been checked yet"""
+        return self.results.get((host, port))
+
+    def start(self):
+        """Start periodic checks on a background event loop thread"""
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._run()),
+                                        name='s1-health', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop periodic checks"""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join(self.timeout + 1)
+        self._thread = None
+
+    def check_now(self, host: str, port: Optional[int] = None) -> HealthResult:
+        """Probe a single host, blocking until the result is known"""
+        result = asyncio.run(self.probe(host, port))
+        self.results[(host, port)] = result
+        return result
+
+    async def _run(self):
+        """Event loop: launch each target's probe when its interval has elapsed"""
+        next_due = {}
+        # Running probe tasks by target; the loop only keeps weak references
+        # to tasks, so these must be held until they finish
+        in_flight = {}
+
+        async def run_probe(key):
+            self.results[key] = await self.probe(*key)
+            if self.on_result:
+                self.on_result()
+
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for key, interval in list(self._targets.items()):
+                if key in in_flight or now < next_due.get(key, 0.0):
+                    continue
+                next_due[key] = now + interval
+                task = asyncio.ensure_future(run_probe(key))
+                in_flight[key] = task
+                task.add_done_callback(lambda _, key=key: in_flight.pop(key, None))
+
+            # Wake up for the next due target, checking for stop regularly
+            wait = min(next_due.values(), default=now + 1) - time.monotonic()
+            await asyncio.sleep(min(max(wait, 0.05), 0.5))
+
+        # Stopped: abandon probes still waiting on the network
+        tasks = list(in_flight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def probe(self, host: str, port: Optional[int] = None) -> HealthResult:
+        """Probe one host: TCP connect if a port is given, otherwise ICMP/UDP"""
+        try:
+            if port:
+                latency = await self._probe_tcp(host, port)
+            else:
+                latency = await self._probe_icmp(host)
+            return HealthResult(latency is not None, latency, None)
+        except Exception as e:
+            return HealthResult(False, None, str(e) or type(e).__name__)
+
+    async def _probe_tcp(self, host: str, port: int) -> Optional[float]:
+        """Round trip time of a TCP connect, or None on timeout/refusal"""
+        start = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.timeout)
+        except (asyncio.TimeoutError, ConnectionError, OSError):
+            return None
+        latency = time.perf_counter() - start
+        writer.close()
+        return latency
+
+    async def _resolve(self, host: str) -> str:
+        """Resolve a hostname to an IPv4 address without blocking the loop"""
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, None, family=socket.AF_INET)
+        return infos[0][4][0]
+
+    async def _probe_icmp(self, host: str) -> Optional[float]:
+        """Round trip time of an ICMP echo (or UDP fallback), or None on timeout"""
+        address = await self._resolve(host)
+        self._sequence = (self._sequence + 1) & 0xFFFF
+
+        for sock_type in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+            try:
+                sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+            except OSError:
+                # Unprivileged ping sockets disabled / no CAP_NET_RAW
+                continue
+            with sock:
+                return await self._icmp_echo(sock, sock_type, address, self._sequence)
+
+        return await self._probe_udp(address)
+
+    async def _icmp_echo(self, sock: socket.socket, sock_type: int, address: str,
+                         sequence: int) -> Optional[float]:
+        """Send one echo request on an ICMP socket and wait for the matching reply"""
+        loop = asyncio.get_running_loop()
+        sock.setblocking(False)
+        ident = os.getpid() & 0xFFFF
+        payload = b's1-display'
+        header = struct.pack('!BBHHH', self.ICMP_ECHO_REQUEST, 0, 0, ident, sequence)
+        checksum = self._checksum(header + payload)
+        packet = struct.pack('!BBHHH', self.ICMP_ECHO_REQUEST, 0, checksum, ident, sequence) + payload
+
+        # Connecting a datagram/raw socket only sets the peer, it never blocks
+        sock.connect((address, 0))
+        start = time.perf_counter()
+        await loop.sock_sendall(sock, packet)
+        deadline = start + self.timeout
+
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None
+            try:
+                data = await asyncio.wait_for(loop.sock_recv(sock, 1024), remaining)
+            except asyncio.TimeoutError:
+                return None
+            if sock_type == socket.SOCK_RAW:
+                # Raw sockets see the IP header and every ICMP packet
+                data = data[(data[0] & 0x0F) * 4:]
+            if len(data) < 8:
+                continue
+            icmp_type, _, _, reply_ident, reply_seq = struct.unpack('!BBHHH', data[:8])
+            if icmp_type != self.ICMP_ECHO_REPLY or reply_seq != sequence:
+                continue
+            # Ping sockets rewrite the identifier, so only check it on raw sockets
+            if sock_type == socket.SOCK_RAW and reply_ident != ident:
+                continue
+            return time.perf_counter() - start
+
+    async def _probe_udp(self, address: str) -> Optional[float]:
+        """Reachability via a UDP datagram to a closed port
+
+        A live host answers with ICMP port unreachable, which surfaces as a
+        refused connection; silence until the timeout counts as down.
+        """
+        loop = asyncio.get_running_loop()
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.setblocking(False)
+            sock.connect((address, self.UDP_PROBE_PORT))
+            start = time.perf_counter()
+            try:
+                await loop.sock_sendall(sock, b'')
+                await asyncio.wait_for(loop.sock_recv(sock, 1), self.timeout)
+            except ConnectionRefusedError:
+                return time.perf_counter() - start
+            except asyncio.TimeoutError:
+                return None
+            # Something is listening and answered
+            return time.perf_counter() - start
+
+    @staticmethod
+    def _checksum(data: bytes) -> int:
+        """Internet checksum (RFC 1071)"""
+        if len(data) % 2:
+            data += b'\x00'
+        total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+        total = (total >> 16) + (total & 0xFFFF)
+        total += total >> 16
+        return ~total & 0xFFFF
+
+
 class ServerMonitorWidget(Widget):
     """Monitor server availability"""
 
-    def __init__(self, config: dict, font_renderer):
+    def __init__(self, config: dict, font_renderer, health_checker: ServerHealthChecker = None):
         super().__init__(config, font_renderer)
         self.name = config.get('name', 'Server')
         self.host = config.get('host')
         self.port = config.get('port', None)
         self.update_interval = config.get('check_interval', 10)
+        self.show_latency = config.get('show_latency', False)
         self.is_online = False
+        self.latency = None
         self.color_online = tuple(config.get('color_online', [0, 255, 0]))
         self.color_offline = tuple(config.get('color_offline', [255, 0, 0]))
 
+        # A shared checker probes all servers concurrently in the background;
+        # without one, each check runs on demand
+        self.health_checker = health_checker
+        self._result = None  # Checker result shown by the cached value
+        if health_checker and self.host:
+            health_checker.register(self.host, self.port, self.update_interval)
+        # Reading the checker's latest result never blocks, so it is done in
+        # the render loop as soon as a new result arrives
+        self.sample_inline = health_checker is not None
+
+    def next_change_time(self) -> float:
+        """Now if the checker has a result not shown yet, otherwise never
+
+        Without a shared checker, the widget probes on its own interval.
+        """
+        if self.health_checker is None:
+            return super().next_change_time()
+        if not self.last_update or \
+                self.health_checker.get_result(self.host, self.port) is not self._result:
+            return 0.0
+        return float('inf')
+
     def get_value(self) -> str:
         if not self.host:
             return f"{self.name}: N/A"
 
-        try:
-            if self.port:
-                # Try TCP connection
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(2)
-                result = sock.connect_ex((self.host, self.port))
-                sock.close()
-                self.is_online = (result == 0)
-            else:
-                # Use ping
-                result = subprocess.run(['ping', '-c', '1', '-W', '2', self.host],
-                                      capture_output=True, timeout=3)
-                self.is_online = (result.returncode == 0)
+        if self.health_checker:
+            result = self._result = self.health_checker.get_result(self.host, self.port)
+            if result is None:
+                return f"{self.name}: ..."
+        else:
+            result = ServerHealthChecker().check_now(self.host, self.port)
 
-            status = "UP" if self.is_online else "DOWN"
-            return f"{self.name}: {status}"
-        except Exception:
-            self.is_online = False
+        self.is_online = result.online
+        self.latency = result.latency
+        if result.error:
             return f"{self.name}: ERR"
 
+        status = "UP" if self.is_online else "DOWN"
+        if self.is_online and self.show_latency:
+            return f"{self.name}: {status} {int(self.latency * 1000)}ms"
+        return f"{self.name}: {status}"
+
     def get_color(self) -> Tuple[int, int, int]:
         """Return color based on online status"""
         return self.color_online if self.is_online else self.color_offline
@@ -315,9 +660,137 @@ class ServerMonitorWidget(Widget):
 class CustomTextWidget(Widget):
     """Display custom static text"""
 
+    sample_inline = True
+
     def __init__(self, config: dict, font_renderer):
         super().__init__(config, font_renderer)
         self.text = config.get('text', '')
 
     def get_value(self) -> str:
         return self.text
+
+    def next_change_time(self) -> float:
+        """Static text never changes once read"""
+        return float('inf') if self.last_update else 0.0
+
+
+class WidgetSampler:
+    """Samples widget values on background threads
+
+    Each widget's get_value() runs in a worker pool on the widget's own
+    update_interval and the result is published to its cached_value, so the
+    render loop only reads cached values and never blocks on slow checks.
+    """
+
+    # Shown until a widget's first sample completes
+    PENDING_TEXT = "..."
+
+    def __init__(self, widgets: list, max_workers: int = 4, metrics=None):
+        self.widgets = [(name, widget) for name, widget in widgets if not widget.sample_inline]
+        self.max_workers = max_workers
+        self.metrics = metrics  # Optional core.metrics.Metrics for per-widget sample times
+        self.values = {}  # Latest value per widget name
+        self.changed = threading.Event()  # Set whenever a sampled value changes
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()  # Interrupts the scheduler's sleep
+        self._executor = None
+        self._thread = None
+
+    def start(self):
+        """Take over updates for the sampled widgets and start sampling"""
+        self._take_over(self.widgets)
+
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='s1-sampler')
+        self._thread = threading.Thread(target=self._run, name='s1-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and hand updates back to the widgets"""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        # Don't wait for checks that are still running (e.g. a slow ping)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        for _, widget in self.widgets:
+            widget.sampled = False
+
+    def set_widgets(self, widgets: list):
+        """Switch to a new widget list
+
+        Widgets that stay keep their cached values and sampling schedule;
+        new ones are sampled straight away.
+        """
+        widgets = [(name, widget) for name, widget in widgets if not widget.sample_inline]
+        remaining = {widget for _, widget in widgets}
+        for _, widget in self.widgets:
+            if widget not in remaining:
+                widget.sampled = False
+
+        if self._thread:
+            self._take_over(widgets)
+        names = {name for name, _ in widgets}
+        for name in list(self.values):
+            if name not in names:
+                del self.values[name]
+        self.widgets = widgets
+        self.changed.set()
+        self._wake.set()
+
+    def _take_over(self, widgets: list):
+        """Mark widgets as sampled, with placeholder text until their first sample"""
+        for _, widget in widgets:
+            widget.sampled = True
+            if widget.cached_value is None:
+                widget.cached_value = self.PENDING_TEXT
+
+    def _run(self):
+        """Scheduler loop: submit each widget when its interval has elapsed"""
+        next_due = {}
+
+        while not self._stop.is_set():
+            widgets = self.widgets
+            next_due = {widget: next_due.get(widget, 0.0) for _, widget in widgets}
+
+            now = time.monotonic()
+            for name, widget in widgets:
+                if now < next_due[widget]:
+                    continue
+                with self._lock:
+                    if widget in self._in_flight:
+                        continue
+                    self._in_flight.add(widget)
+                next_due[widget] = now + widget.update_interval
+                self._executor.submit(self._sample, name, widget)
+
+            # Sleep until the next widget is due (or the widget list changes)
+            wait = min(next_due.values(), default=now + 1) - time.monotonic()
+            self._wake.wait(max(wait, 0.05))
+            self._wake.clear()
+
+    def _sample(self, name: str, widget: Widget):
+        """Run one widget's get_value() and publish the result"""
+        try:
+            start = time.perf_counter()
+            value = widget.get_value()
+            if self.metrics:
+                self.metrics.observe('widget_sample_seconds', 'widget', name,
+                                     time.perf_counter() - start)
+            previous = widget.cached_value
+            widget.cached_value = value
+            widget.last_update = time.time()
+            self.values[name] = value
+            if value != previous:
+                self.changed.set()
+        except Exception as e:
+            print(f"Error sampling {name}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(widget)
@@ -4,15 +4,29 @@ Web GUI for S1 Display Configuration
 Provides drag-and-drop interface for configuring widgets
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
+from collections import OrderedDict
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
 import yaml
 import os
 import subprocess
 import sys
+import zlib
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+from core.control_socket import ControlClient, ControlError, DEFAULT_SOCKET_PATH
+from core.s1_display import S1Display
+from core.frame_delta import changed_rects, encode_rect
+from core.transports import DEFAULT_PATH_CACHE
+from dashboard import render_preview
+
 app = Flask(__name__)
 
 CONFIG_PATH = '/opt/s1-display/config.yaml'
@@ -27,6 +41,131 @@ elif os.path.exists(LOCAL_CONFIG_PATH):
 else:
     ACTIVE_CONFIG_PATH = TEMPLATE_CONFIG_PATH
 
+# Rendered previews keyed by config hash, least recently used first
+PREVIEW_CACHE_SIZE = 32
+PREVIEW_MAX_AGE = 30  # seconds; keeps time/date widgets reasonably current
+preview_cache = OrderedDict()
+preview_lock = threading.Lock()
+
+# RGB888 bytes for every framebuffer pixel value, built on first use
+_rgb888_table = None
+
+# Live stream: seconds between keepalive comments, and how long to wait
+# before retrying when the dashboard is not reachable
+STREAM_KEEPALIVE = 15
+STREAM_RETRY = 2
+
+
+class StreamViewer:
+    """One browser's slot in the live stream
+
+    Holds at most one undelivered message. A viewer that is still sending
+    the previous message when the next frame arrives skips ahead: its next
+    message is a keyframe of the latest frame instead of a backlog of deltas.
+    """
+
+    def __init__(self):
+        self.pending = None
+        self.needs_keyframe = True  # New viewers start with the full frame
+        self.ready = threading.Event()
+
+    def publish(self, message):
+        if self.pending is not None:
+            self.needs_keyframe = True
+        self.pending = message
+        self.ready.set()
+
+    def next_message(self, streamer, timeout):
+        """Wait for the next message to send; None on timeout"""
+        if not self.ready.wait(timeout):
+            return None
+        self.ready.clear()
+        message, self.pending = self.pending, None
+        if self.needs_keyframe:
+            self.needs_keyframe = False
+            message = streamer.keyframe()
+        return message
+
+
+class FrameStreamer:
+    """Fetches frames from the running dashboard and fans out deltas
+
+    A single thread long-polls the control socket and encodes each new
+    frame once (changed rectangles, RLE RGB565); all viewers share the
+    encoded messages. The thread runs only while someone is watching.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._viewers = set()
+        self._thread = None
+        self.seq = None
+        self.frame = None
+        self._keyframe = None  # Encoded full frame for self.seq, built on demand
+
+    def subscribe(self):
+        viewer = StreamViewer()
+        with self._lock:
+            self._viewers.add(viewer)
+            if self.frame is not None:
+                viewer.ready.set()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='frame-stream', daemon=True)
+                self._thread.start()
+        return viewer
+
+    def unsubscribe(self, viewer):
+        with self._lock:
+            self._viewers.discard(viewer)
+
+    def keyframe(self):
+        """Message repainting the whole screen with the latest frame"""
+        with self._lock:
+            if self._keyframe is None and self.frame is not None:
+                self._keyframe = self._encode(self.seq, self.frame,
+                                              [(0, 0, S1Display.WIDTH, S1Display.HEIGHT)], True)
+            return self._keyframe
+
+    @staticmethod
+    def _encode(seq, frame, rects, key):
+        return json.dumps({
+            'seq': seq,
+            'key': key,
+            'width': S1Display.WIDTH,
+            'height': S1Display.HEIGHT,
+            'rects': [[x, y, w, h, base64.b64encode(encode_rect(frame, S1Display.WIDTH, x, y, w, h)).decode()]
+                      for x, y, w, h in rects],
+        })
+
+    def _run(self):
+        client = get_control_client()
+        while True:
+            with self._lock:
+                if not self._viewers:
+                    self._thread = None
+                    return
+            try:
+                seq, frame = client.wait_frame(self.seq, timeout=STREAM_KEEPALIVE)
+            except ControlError:
+                time.sleep(STREAM_RETRY)
+                continue
+            if frame is None:
+                continue
+            if self.seq is not None and seq < self.seq:
+                # The dashboard restarted; start over with a keyframe
+                self.frame = None
+
+            rects = changed_rects(self.frame, frame, S1Display.WIDTH, S1Display.HEIGHT)
+            message = self._encode(seq, frame, rects, self.frame is None)
+            with self._lock:
+                self.seq, self.frame, self._keyframe = seq, frame, None
+                viewers = list(self._viewers)
+            for viewer in viewers:
+                viewer.publish(message)
+
+
+frame_streamer = FrameStreamer()
+
 
 def load_config():
     """Load current configuration"""
@@ -49,13 +188,33 @@ def save_config(config):
         return False
 
 
+def get_control_client():
+    """Client for the running dashboard's control socket"""
+    socket_path = (load_config() or {}).get('control', {}).get('socket_path', DEFAULT_SOCKET_PATH)
+    return ControlClient(socket_path)
+
+
 def get_default_config():
     """Return default configuration"""
     return {
         'display': {
             'orientation': 'landscape',
             'background_color': [0, 0, 0],
-            'update_interval': 1
+            'update_interval': 1,
+            'partial_updates': False,
+            'shadow_frame': False,
+            'pacing': 'fixed',
+            'packet_delay': 0.01,
+            'async_transmit': False,
+            'transport': 'hidapi',
+            'record_path': 's1-packets.rec',
+            'device_serial': '',
+            'device_cache': DEFAULT_PATH_CACHE,
+            'quiet_connect': False,
+            'hotplug_recovery': True
+        },
+        'control': {
+            'socket_path': DEFAULT_SOCKET_PATH
         },
         'time': {
             'enabled': True,
@@ -133,13 +292,22 @@ def get_config():
 
 @app.route('/api/config', methods=['POST'])
 def update_config():
-    """Update configuration"""
+    """Update configuration
+
+    The config is saved to disk and, when the dashboard is running, applied
+    to it directly over the control socket (no restart needed).
+    """
     try:
         config = request.json
-        if save_config(config):
-            return jsonify({'success': True, 'message': 'Configuration saved'})
-        else:
+        if not save_config(config):
             return jsonify({'success': False, 'message': 'Failed to save configuration'}), 500
+
+        try:
+            get_control_client().apply_config(config)
+        except ControlError as e:
+            return jsonify({'success': True, 'live': False,
+                            'message': f'Configuration saved but not applied: {e}'})
+        return jsonify({'success': True, 'live': True, 'message': 'Configuration saved and applied'})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -191,6 +359,144 @@ def get_status():
         })
 
 
+@app.route('/api/values', methods=['GET'])
+def get_values():
+    """Widget values as currently shown by the running dashboard"""
+    try:
+        return jsonify({'success': True, 'widgets': get_control_client().values()})
+    except ControlError as e:
+        return jsonify({'success': False, 'message': str(e)}), 503
+
+
+@app.route('/api/framebuffer', methods=['GET'])
+def get_framebuffer():
+    """Raw framebuffer of the running dashboard (RGB565, as sent to the device)"""
+    try:
+        width, height, pixels = get_control_client().framebuffer()
+    except ControlError as e:
+        return jsonify({'success': False, 'message': str(e)}), 503
+    return Response(pixels, mimetype='application/octet-stream',
+                    headers={'X-Width': str(width), 'X-Height': str(height)})
+
+
+def config_hash(config):
+    """Stable hash of a config for the preview cache"""
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+
+def get_preview(config):
+    """Return the cache entry {'frame', 'png', 'time'} for a config, rendering on a miss"""
+    key = config_hash(config)
+    with preview_lock:
+        entry = preview_cache.get(key)
+        if entry and time.time() - entry['time'] < PREVIEW_MAX_AGE:
+            preview_cache.move_to_end(key)
+            return entry
+
+    entry = {'frame': render_preview(config), 'png': None, 'time': time.time()}
+    with preview_lock:
+        preview_cache[key] = entry
+        preview_cache.move_to_end(key)
+        while len(preview_cache) > PREVIEW_CACHE_SIZE:
+            preview_cache.popitem(last=False)
+    return entry
+
+
+def framebuffer_to_rgb888(frame):
+    """Convert framebuffer pixels (RGB565, high byte first) to packed RGB888"""
+    global _rgb888_table
+    if _rgb888_table is None:
+        table = []
+        for value in range(0x10000):
+            # Pixels are read as native little-endian words, so the high byte is the low half
+            rgb = ((value & 0xFF) << 8) | (value >> 8)
+            r, g, b = (rgb >> 11) & 0x1F, (rgb >> 5) & 0x3F, rgb & 0x1F
+            table.append(bytes(((r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2))))
+        _rgb888_table = table
+    table = _rgb888_table
+    return b''.join([table[pixel] for pixel in memoryview(frame).cast('H')])
+
+
+def encode_png(width, height, rgb):
+    """Encode packed RGB888 pixels as a PNG"""
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body))
+
+    stride = width * 3
+    # Filter type 0 (none) before every row
+    raw = b''.join(b'\x00' + rgb[y * stride:(y + 1) * stride] for y in range(height))
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) +
+            chunk(b'IDAT', zlib.compress(raw, 6)) + chunk(b'IEND', b''))
+
+
+def preview_config():
+    """Config to preview: the posted one, or the saved config for GET"""
+    if request.method == 'POST':
+        return request.get_json(force=True)
+    return load_config()
+
+
+@app.route('/api/preview.png', methods=['GET', 'POST'])
+def get_preview_png():
+    """Preview of a config rendered by the real dashboard code"""
+    try:
+        entry = get_preview(preview_config())
+        if entry['png'] is None:
+            rgb = framebuffer_to_rgb888(entry['frame'])
+            entry['png'] = encode_png(S1Display.WIDTH, S1Display.HEIGHT, rgb)
+        return Response(entry['png'], mimetype='image/png')
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@app.route('/api/preview.rgb565', methods=['GET', 'POST'])
+def get_preview_raw():
+    """Preview framebuffer as raw RGB565 (high byte first, as sent to the device)"""
+    try:
+        entry = get_preview(preview_config())
+        return Response(entry['frame'], mimetype='application/octet-stream',
+                        headers={'X-Width': str(S1Display.WIDTH),
+                                 'X-Height': str(S1Display.HEIGHT)})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@app.route('/metrics')
+def get_metrics():
+    """Dashboard frame timings and counters for Prometheus to scrape"""
+    try:
+        text = get_control_client().metrics()
+    except ControlError as e:
+        return Response(f"# dashboard not reachable: {e}\n", status=503, mimetype='text/plain')
+    return Response(text, mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/stream')
+def stream_frames():
+    """Server-Sent Events stream of the frames the dashboard sends to the panel
+
+    Each event is a JSON object with the frame's sequence number and a list
+    of [x, y, w, h, rle] rectangles to paint; see core.frame_delta for the
+    run encoding. Slow clients skip frames rather than queueing them.
+    """
+    def generate():
+        viewer = frame_streamer.subscribe()
+        try:
+            while True:
+                message = viewer.next_message(frame_streamer, STREAM_KEEPALIVE)
+                if message is None:
+                    yield ': keepalive\n\n'
+                else:
+                    yield f'data: {message}\n\n'
+        finally:
+            frame_streamer.unsubscribe(viewer)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.route('/api/widgets', methods=['GET'])
 def get_available_widgets():
     """Get list of available widgets"""
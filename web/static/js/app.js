@@ -3,6 +3,10 @@
 let config = {};
 let availableWidgets = [];
 let selectedWidget = null;
+let previewEnabled = false;
+let previewTimer = null;
+let liveSource = null;
+let liveSeq = null;
 
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
@@ -170,6 +174,93 @@ function renderDisplay() {
     }
 
     dropHint.style.display = hasWidgets ? 'none' : 'block';
+
+    if (previewEnabled) {
+        schedulePreview();
+    }
+}
+
+// Toggle the server-rendered preview (exactly what the dashboard would draw)
+function togglePreview() {
+    previewEnabled = !previewEnabled;
+    document.getElementById('preview-btn').classList.toggle('active', previewEnabled);
+    document.getElementById('display-screen').classList.toggle('previewing', previewEnabled);
+    if (previewEnabled) {
+        refreshPreview();
+    }
+}
+
+// Toggle the live view of what the panel is showing right now
+function toggleLiveView() {
+    const screen = document.getElementById('display-screen');
+    if (liveSource) {
+        liveSource.close();
+        liveSource = null;
+    } else {
+        liveSeq = null;
+        liveSource = new EventSource('/api/stream');
+        liveSource.onmessage = (event) => paintFrameDelta(JSON.parse(event.data));
+    }
+    document.getElementById('live-btn').classList.toggle('active', !!liveSource);
+    screen.classList.toggle('streaming', !!liveSource);
+}
+
+// Paint changed rectangles (RLE runs of count + RGB565 high byte first)
+function paintFrameDelta(delta) {
+    // Deltas only apply on top of the frame they follow; keyframes always apply
+    if (!delta.key && liveSeq !== null && delta.seq <= liveSeq) {
+        return;
+    }
+    liveSeq = delta.seq;
+
+    const ctx = document.getElementById('live-canvas').getContext('2d');
+    for (const [x, y, w, h, encoded] of delta.rects) {
+        const runs = Uint8Array.from(atob(encoded), c => c.charCodeAt(0));
+        const image = ctx.createImageData(w, h);
+        const data = image.data;
+        let offset = 0;
+        for (let i = 0; i < runs.length; i += 3) {
+            const rgb = (runs[i + 1] << 8) | runs[i + 2];
+            const r = (rgb >> 11) & 0x1F;
+            const g = (rgb >> 5) & 0x3F;
+            const b = rgb & 0x1F;
+            for (let n = 0; n < runs[i]; n++) {
+                data[offset] = (r << 3) | (r >> 2);
+                data[offset + 1] = (g << 2) | (g >> 4);
+                data[offset + 2] = (b << 3) | (b >> 2);
+                data[offset + 3] = 255;
+                offset += 4;
+            }
+        }
+        ctx.putImageData(image, x, y);
+    }
+}
+
+// Coalesce rapid edits into one preview request
+function schedulePreview() {
+    clearTimeout(previewTimer);
+    previewTimer = setTimeout(refreshPreview, 200);
+}
+
+async function refreshPreview() {
+    try {
+        const response = await fetch('/api/preview.png', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(config)
+        });
+        if (!response.ok) {
+            throw new Error(response.statusText);
+        }
+        const blob = await response.blob();
+        const image = document.getElementById('preview-image');
+        if (image.src) {
+            URL.revokeObjectURL(image.src);
+        }
+        image.src = URL.createObjectURL(blob);
+    } catch (error) {
+        showToast('Failed to render preview', 'error');
+    }
 }
 
 // Add a placed widget to the display
@@ -210,6 +301,12 @@ function setupEventListeners() {
     document.getElementById('save-btn').addEventListener('click', saveConfig);
     document.getElementById('restart-btn').addEventListener('click', saveAndRestart);
     document.getElementById('clear-all-btn').addEventListener('click', clearAll);
+    document.getElementById('preview-btn').addEventListener('click', togglePreview);
+    document.getElementById('live-btn').addEventListener('click', toggleLiveView);
+    // Property edits bubble up here after updating config
+    document.addEventListener('change', () => {
+        if (previewEnabled) schedulePreview();
+    });
     document.getElementById('add-server-btn').addEventListener('click', () => {
         document.getElementById('server-modal').classList.add('active');
     });
@@ -843,18 +940,23 @@ async function saveConfig() {
 
         const result = await response.json();
         if (result.success) {
-            showToast('Configuration saved', 'success');
+            showToast(result.live ? 'Configuration applied' : 'Configuration saved', 'success');
         } else {
             showToast('Failed to save: ' + result.message, 'error');
         }
+        return result;
     } catch (error) {
         showToast('Failed to save configuration', 'error');
+        return null;
     }
 }
 
-// Save and restart
+// Save and restart (only needed when the running dashboard could not apply the config)
 async function saveAndRestart() {
-    await saveConfig();
+    const saved = await saveConfig();
+    if (saved && saved.live) {
+        return;
+    }
 
     try {
         const response = await fetch('/api/restart', {